@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Import-time benchmark for the numerical modules.
+
+Each module is imported in a fresh interpreter a few times and the median
+time is compared with a budget, the script also checks that no plotting or
+scipy module was imported along the way. Exits with status 1 on a regression.
+
+    python benchmark_import.py [--repeat 5] [--budget 0.5]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+MODULES = ['utils', 'probability', 'data', 'statistics', 'plots']
+HEAVY = ['matplotlib', 'seaborn', 'scipy']
+
+SCRIPT = '''
+import sys, time
+t = time.perf_counter()
+import {module}
+t = time.perf_counter() - t
+print(t, ','.join(sorted(m for m in {heavy} if m in sys.modules)))
+'''
+
+def importTime(module: str) -> tuple:
+    '''
+    Imports a module in a fresh interpreter.
+
+    Parameters
+    ----------
+    module : str
+        Module name.
+
+    Returns
+    -------
+    tuple
+        Import time (seconds) of the module on top of the interpreter startup
+        and the list of heavy modules it pulled in.
+
+    '''
+    here = os.path.dirname(os.path.abspath(__file__))
+    output = subprocess.run([sys.executable, '-c', SCRIPT.format(module=module, heavy=HEAVY)],
+                            cwd=here, capture_output=True, text=True, check=True).stdout.split()
+    return float(output[0]), output[1].split(',') if len(output) > 1 else []
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5, help='imports per module')
+    parser.add_argument('--budget', type=float, default=0.5, help='maximum median import time in seconds')
+    args = parser.parse_args()
+
+    failed = False
+    for module in MODULES:
+        times, heavy = [], []
+        for _ in range(args.repeat):
+            t, heavy = importTime(module)
+            times.append(t)
+        median = sorted(times)[len(times) // 2]
+        status = 'ok'
+        if heavy:
+            status = 'FAIL imported ' + ', '.join(heavy)
+        elif median > args.budget:
+            status = f'FAIL over the {args.budget}s budget'
+        failed |= status != 'ok'
+        print(f"{module:<12} {median * 1000:8.1f} ms  {status}")
+    return int(failed)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,329 @@
+# -*- coding: utf-8 -*-
+"""
+Opt-in tabulated cdf/ppf cache for the continuous distributions.
+
+For each distribution (identified by its class and parameters) the cdf is
+tabulated once on a grid, fine enough for monotone cubic interpolation to
+stay within a given error, and later evaluations interpolate the table.
+Distributions whose cdf and ppf are cheaper than an interpolation (Uniform
+and Exponential) are evaluated directly.
+"""
+from bisect import bisect_right
+from collections import OrderedDict
+import numpy as np
+
+# Closed-form cdf and ppf, faster to evaluate than to interpolate
+_DIRECT = ('ContinuousDistribution.Uniform', 'ContinuousDistribution.Exponential')
+
+class CdfCache:
+    '''
+    LRU cache of cdf/ppf tables of continuous distributions.
+
+    Tables are evicted (least recently used first) when their total size goes
+    over max_bytes. Lookups are counted in hits and misses.
+    '''
+    def __init__(self, tol: float= 1e-9, max_bytes: int= 64 * 2**20, max_points: int= 2**20):
+        '''
+
+
+        Parameters
+        ----------
+        tol : float, optional
+            Maximum absolute error of the interpolated cdf (and of cdf(ppf(p)) - p).
+            The default is 1e-9.
+        max_bytes : int, optional
+            Memory cap of all the tables. The default is 64 MiB.
+        max_points : int, optional
+            Maximum number of grid points of a table. The default is 2**20.
+
+        Returns
+        -------
+        None.
+
+        '''
+        self.tol = tol
+        self.max_bytes = max_bytes
+        self.max_points = max_points
+        self.tables = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __repr__(self):
+        return f"CdfCache with {len(self.tables)} tables ({self.nbytes} bytes) \
+                 \nhits = {self.hits}, misses = {self.misses} and evictions = {self.evictions}"
+
+    def cdf(self, dist, x):
+        '''
+        F(X <= x) interpolated from the table of dist.
+
+        Parameters
+        ----------
+        dist : distribution
+            Continuous distribution with a vectorized cdf.
+        x : float
+            Values, scalar or array.
+
+        Returns
+        -------
+        float
+            Interpolated cdf.
+
+        '''
+        if type(dist).__qualname__ in _DIRECT:
+            return dist.cdf(x)
+        return self.table(dist).cdf(x)
+
+    def ppf(self, dist, p):
+        '''
+        Inverse of the cdf interpolated from the table of dist.
+
+        Parameters
+        ----------
+        dist : distribution
+            Continuous distribution with vectorized cdf and ppf.
+        p : float
+            Probabilities, scalar or array.
+
+        Returns
+        -------
+        float
+            Interpolated ppf.
+
+        '''
+        if type(dist).__qualname__ in _DIRECT:
+            return dist.ppf(p)
+        table = self.table(dist)
+        if table.p is None:
+            self.nbytes -= table.nbytes
+            table.tabulatePpf(self.tol)
+            self.nbytes += table.nbytes
+            self._evict()
+        return table.ppf(p)
+
+    def table(self, dist):
+        '''
+        Table of dist, built (and the least recently used tables evicted) on a miss.
+        '''
+        key = cacheKey(dist)
+        if key in self.tables:
+            self.hits += 1
+            self.tables.move_to_end(key)
+            return self.tables[key]
+        self.misses += 1
+        table = _CdfTable(dist, self.tol, self.max_points)
+        self.tables[key] = table
+        self.nbytes += table.nbytes
+        self._evict()
+        return table
+
+    def clear(self):
+        '''
+        Drops every table and resets the counters.
+        '''
+        self.__init__(self.tol, self.max_bytes, self.max_points)
+
+    def _evict(self):
+        # The most recent table is kept even when it alone goes over the cap
+        while self.nbytes > self.max_bytes and len(self.tables) > 1:
+            _, table = self.tables.popitem(last=False)
+            self.nbytes -= table.nbytes
+            self.evictions += 1
+
+def cacheKey(dist) -> tuple:
+    '''
+    Identifies a distribution by its class and scalar attributes (its parameters).
+    
+    Equal ints and floats hash alike, so the values are used as they are. The
+    key is stored on the distribution the first time, as the parameters of a
+    distribution do not change after it is created.
+    '''
+    key = getattr(dist, '_cache_key', None)
+    if key is None:
+        key = type(dist), tuple(item for item in vars(dist).items() if isinstance(item[1], (int, float, np.number)))
+        dist._cache_key = key
+    return key
+
+class _CdfTable:
+    '''
+    Tabulated cdf (and, on demand, ppf) of a distribution with monotone cubic interpolation.
+    '''
+    def __init__(self, dist, tol: float, max_points: int):
+        self.dist = dist
+        self.max_points = max_points
+        lo, hi = _support(dist, tol)
+        n = 64
+        while True:
+            x = np.linspace(lo, hi, n + 1)
+            F = dist.cdf(x)
+            d = pchipSlopes(x, F)
+            mid = _checkpoints(x)
+            error = np.max(np.abs(pchip(x, F, d, mid, uniform=True) - dist.cdf(mid)))
+            if error <= tol or 2 * n > max_points:
+                break
+            n *= 2
+        self.x, self.F, self.d = x, F, d
+        self.lo, self.hi, self.step = float(x[0]), float(x[-1]), float(x[1] - x[0])
+        self.p = None
+
+    @property
+    def nbytes(self) -> int:
+        arrays = [self.x, self.F, self.d] + ([self.p, self.xp, self.dp] if self.p is not None else [])
+        return sum(a.nbytes for a in arrays)
+
+    def cdf(self, x):
+        if isinstance(x, (int, float, np.number)):
+            t = float(x)
+            if not self.lo <= t <= self.hi:
+                return self.dist.cdf(t)
+            i = min(int((t - self.lo) / self.step), self.x.size - 2)
+            return _pchipAt(self.x, self.F, self.d, i, t)
+        x = np.asarray(x, dtype=float)
+        F = np.atleast_1d(pchip(self.x, self.F, self.d, x, uniform=True))
+        outside = (x < self.x[0]) | (x > self.x[-1])
+        if outside.any():
+            F[np.atleast_1d(outside)] = self.dist.cdf(x[outside])
+        return F.reshape(x.shape)[()]
+
+    def tabulatePpf(self, tol: float):
+        '''
+        Inverse table: the cdf nodes are refined until cdf(ppf(p)) is within tol of p.
+        '''
+        x = self.x
+        while True:
+            F = self.dist.cdf(x)
+            keep = np.concatenate([[True], np.diff(F) > 0])
+            p, xp = F[keep], x[keep]
+            dp = pchipSlopes(p, xp)
+            mid = _checkpoints(p)
+            error = np.max(np.abs(self.dist.cdf(pchip(p, xp, dp, mid)) - mid))
+            if error <= tol or 2 * x.size > self.max_points:
+                break
+            x = np.linspace(x[0], x[-1], 2 * (x.size - 1) + 1)
+        self.p, self.xp, self.dp = p, xp, dp
+        self.p_nodes = p.tolist()
+
+    def ppf(self, p):
+        if isinstance(p, (int, float, np.number)):
+            q = float(p)
+            assert 0 <= q <= 1, "Probabilities must be between 0 and 1"
+            if not self.p_nodes[0] <= q <= self.p_nodes[-1]:
+                return self.dist.ppf(q)
+            i = min(bisect_right(self.p_nodes, q) - 1, len(self.p_nodes) - 2)
+            return _pchipAt(self.p, self.xp, self.dp, i, q)
+        p = np.asarray(p, dtype=float)
+        assert ((0 <= p) & (p <= 1)).all(), "Probabilities must be between 0 and 1"
+        x = np.atleast_1d(pchip(self.p, self.xp, self.dp, p))
+        outside = (p < self.p[0]) | (p > self.p[-1])
+        if outside.any():
+            x[np.atleast_1d(outside)] = self.dist.ppf(p[outside])
+        return x.reshape(p.shape)[()]
+
+def _pchipAt(x: np.ndarray, y: np.ndarray, d: np.ndarray, i: int, t: float) -> float:
+    '''
+    Cubic Hermite interpolant of pchip at a single point t of the interval [x[i], x[i + 1]].
+    '''
+    x0, h = x.item(i), x.item(i + 1) - x.item(i)
+    s = (t - x0) / h
+    s2, s3 = s * s, s * s * s
+    return ((2 * s3 - 3 * s2 + 1) * y.item(i) + (s3 - 2 * s2 + s) * h * d.item(i)
+            + (-2 * s3 + 3 * s2) * y.item(i + 1) + (s3 - s2) * h * d.item(i + 1))
+
+def _checkpoints(x: np.ndarray) -> np.ndarray:
+    '''
+    Points at a quarter, half and three quarters of every interval of the grid x.
+    '''
+    return (x[:-1, None] + np.diff(x)[:, None] * np.array([0.25, 0.5, 0.75])).ravel()
+
+def _support(dist, tol: float) -> tuple:
+    '''
+    Interval outside of which the cdf is within tol / 10 of 0 or 1.
+    '''
+    eps = tol / 10
+    if hasattr(dist, 'ppf'):
+        lo, hi = dist.ppf(eps), dist.ppf(1 - eps)
+    else:
+        center, scale = float(dist.mean), float(dist.var)**0.5 or 1.0
+        lo, hi = center - scale, center + scale
+        while dist.cdf(lo) > eps:
+            lo -= 2 * (hi - lo)
+        while dist.cdf(hi) < 1 - eps:
+            hi += 2 * (hi - lo)
+    return float(lo), float(hi)
+
+def pchipSlopes(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    '''
+    Slopes of the monotone piecewise cubic Hermite interpolant (Fritsch-Carlson).
+
+    Parameters
+    ----------
+    x : np.ndarray
+        Increasing nodes.
+    y : np.ndarray
+        Values at the nodes.
+
+    Returns
+    -------
+    np.ndarray
+        Slope at each node.
+
+    '''
+    h = np.diff(x)
+    delta = np.diff(y) / h
+    d = np.empty(x.size)
+    d[0] = _pchipEndSlope(h[0], h[1], delta[0], delta[1]) if x.size > 2 else delta[0]
+    d[-1] = _pchipEndSlope(h[-1], h[-2], delta[-1], delta[-2]) if x.size > 2 else delta[-1]
+    # Weighted harmonic mean of the neighbouring secants, 0 at local extrema
+    w1, w2 = 2 * h[1:] + h[:-1], h[1:] + 2 * h[:-1]
+    same_sign = delta[:-1] * delta[1:] > 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        harmonic = (w1 + w2) / (w1 / delta[:-1] + w2 / delta[1:])
+    d[1:-1] = np.where(same_sign, harmonic, 0)
+    return d
+
+def _pchipEndSlope(h0: float, h1: float, delta0: float, delta1: float) -> float:
+    '''
+    Three point slope at an end of the grid, limited to keep the interpolant monotone.
+    '''
+    d = ((2 * h0 + h1) * delta0 - h0 * delta1) / (h0 + h1)
+    if np.sign(d) != np.sign(delta0):
+        return 0.0
+    if np.sign(delta0) != np.sign(delta1) and abs(d) > abs(3 * delta0):
+        return 3 * delta0
+    return d
+
+def pchip(x: np.ndarray, y: np.ndarray, d: np.ndarray, t, uniform: bool= False) -> np.ndarray:
+    '''
+    Evaluates the piecewise cubic Hermite interpolant of (x, y) with slopes d.
+
+    Parameters
+    ----------
+    x : np.ndarray
+        Increasing nodes.
+    y : np.ndarray
+        Values at the nodes.
+    d : np.ndarray
+        Slopes at the nodes (pchipSlopes).
+    t : np.ndarray
+        Points to evaluate.
+    uniform : bool, optional
+        If True the nodes are equally spaced and the interval of each point is
+        found arithmetically instead of by binary search. The default is False.
+
+    Returns
+    -------
+    np.ndarray
+        Interpolated values (extrapolated with the end cubics outside of [x[0], x[-1]]).
+
+    '''
+    t = np.asarray(t, dtype=float)
+    if uniform:
+        i = np.clip(np.floor((t - x[0]) / (x[1] - x[0])), 0, x.size - 2).astype(np.intp)
+    else:
+        i = np.clip(np.searchsorted(x, t, side='right') - 1, 0, x.size - 2)
+    h = x[i + 1] - x[i]
+    s = (t - x[i]) / h
+    s2, s3 = s * s, s * s * s
+    return ((2 * s3 - 3 * s2 + 1) * y[i] + (s3 - 2 * s2 + s) * h * d[i]
+            + (-2 * s3 + 3 * s2) * y[i + 1] + (s3 - s2) * h * d[i + 1])
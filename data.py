@@ -1,11 +1,23 @@
-import regex as re
+import csv
+import itertools
+import json
+import os
+import re
+import tempfile
 import numpy as np
 
 class Dataset:
     '''
     Loader for csv datasets
+    
+    Each column is stored as a contiguous typed numpy array (int64, float64
+    or bool), columns of strings are stored as int32 codes into a sorted
+    array of categories. The type of each column is kept in dtypes.
+    
+    Csv files are cached next to the source (see saveCache), later loads of
+    an unchanged file memory-map the cached columns as they are accessed.
     '''
-    def __init__(self, path: str):
+    def __init__(self, path: str= None, data: dict= None, cache: bool= True):
         '''
         
 
@@ -13,27 +25,150 @@ class Dataset:
         ----------
         path : str, optional
             Path to csv file.
+        data : dict, optional
+            Columns by name, used when no path is given.
+        cache : bool, optional
+            Read and write the binary column cache of the csv file. The default is True.
 
         Returns
         -------
         None.
 
         '''
-        self.data = parseCsv(path)
-        self.header = list(self.data.keys())
+        self.data = {}
+        self.dtypes = {}
+        self.categories = {}
+        self.header = []
+        self.index = None
+        self._orders = {}
+        if path is not None and cache and loadCache(path, self):
+            return
+        # Taken before parsing, so a file edited meanwhile is not cached under its new mtime
+        stat = os.stat(path) if path is not None and cache else None
+        columns = parseCsv(path) if path is not None else data or {}
+        for name, values in columns.items():
+            self[name] = values
+        if stat is not None:
+            saveCache(self, path, stat)
      
     def __repr__(self):
         to_print = ', '.join(self.header) + '\n'
-        to_print_vals = list(zip(*[self.data[i] for i in self.header]))
+        to_print_vals = list(zip(*[self[i] for i in self.header]))
         for i in to_print_vals:
             to_print += ', '.join([str(j) for j in i]) + '\n'
         return to_print
     
+    def __len__(self):
+        return len(self.data[self.header[0]]) if self.header else 0
+    
     def __getitem__(self, item):
-         return self.data[item]
+        if self.dtypes[item] == 'category':
+            return self.categories[item][self._stored(item)]
+        return self._stored(item)
      
     def __setitem__(self, name, item):
-         self.data[name] = item
+        self._orders.pop(name, None)
+        self.data[name], self.dtypes[name], categories = toColumn(item)
+        if categories is not None:
+            self.categories[name] = categories
+        else:
+            self.categories.pop(name, None)
+        if name not in self.header:
+            self.header.append(name)
+    
+    def codes(self, name: str) -> np.ndarray:
+        '''
+        Integer codes of a categorical column (positions in self.categories[name]).
+
+        Parameters
+        ----------
+        name : str
+            Column name.
+
+        Returns
+        -------
+        np.ndarray
+            The codes.
+
+        '''
+        assert self.dtypes[name] == 'category', f"{name} is not a categorical column"
+        return self._stored(name)
+    
+    def factorize(self, keys) -> tuple:
+        '''
+        Group ids of the rows by the values of one or more columns.
+        
+        Each key column is reduced to integer codes (categorical columns
+        already are, integer columns of a small range are offset), the codes
+        are combined key by key and renumbered, so the groups are numbered in
+        the sorted order of their keys. Renumbering uses np.bincount while
+        the combined codes stay small and np.unique otherwise.
+
+        Parameters
+        ----------
+        keys : str or list
+            Column name or names.
+
+        Returns
+        -------
+        tuple
+            Group id of each row (int64, from 0 to the number of groups - 1)
+            and a Dataset with the key values of each group.
+
+        '''
+        keys = [keys] if isinstance(keys, str) else list(keys)
+        assert len(keys) > 0, "Give at least one key"
+        group = np.zeros(len(self), dtype=np.int64)
+        n_groups = 1
+        key_codes, key_values = [], []
+        for name in keys:
+            if self.dtypes[name] == 'category':
+                values, codes = self.categories[name], self._stored(name).astype(np.int64)
+            else:
+                values, codes = _denseCodes(self._stored(name))
+            used, group = _renumber(group * values.size + codes, n_groups * values.size)
+            n_groups = used.size
+            # Codes of the previous keys and of this one for each group
+            key_codes = [k[used // values.size] for k in key_codes] + [used % values.size]
+            key_values.append(values)
+        return group, Dataset(data={name: values[k] for name, values, k in zip(keys, key_values, key_codes)})
+    
+    def groupby(self, keys):
+        '''
+        Groups the rows by the values of one or more columns.
+
+        Parameters
+        ----------
+        keys : str or list
+            Column name or names.
+
+        Returns
+        -------
+        GroupBy
+            The groups, aggregated with its agg method.
+
+        '''
+        return GroupBy(self, keys)
+    
+    def _stored(self, name: str) -> np.ndarray:
+        '''
+        Stored array of a column, applying the pending row permutation of the last sorts.
+        '''
+        if name in self._orders:
+            self.data[name] = self.data[name][self._orders.pop(name)]
+        return self.data[name]
+    
+    def numeric(self) -> list:
+        '''
+        Names of the int64, float64 and bool columns.
+
+        Returns
+        -------
+        list
+            Column names.
+
+        '''
+        return [i for i in self.header if self.dtypes[i] != 'category']
          
     def sortByName(self, name: str):
         '''
@@ -49,21 +184,477 @@ class Dataset:
         None.
 
         '''
-        idxs = np.argsort(self[name])
+        self.sort(name)
+    
+    def sort(self, keys, ascending= True):
+        '''
+        Stable sort of the rows by one or more columns.
+        
+        Only the permutation is computed here, each column applies it
+        (once) the next time it is accessed. The permutation from the
+        original rows to the current order is kept in self.index. nan values
+        go last in both orders.
+
+        Parameters
+        ----------
+        keys : str or list
+            Column name or names, the first one is the primary key.
+        ascending : bool or list, optional
+            Order for all the keys or for each one of them. The default is True.
+
+        Returns
+        -------
+        None.
+
+        '''
+        keys = [keys] if isinstance(keys, str) else list(keys)
+        ascending = [ascending] * len(keys) if isinstance(ascending, bool) else list(ascending)
+        assert len(keys) == len(ascending), "Give one order per key"
+        
+        sort_keys = []
+        for name, asc in zip(keys, ascending):
+            column = self._stored(name)
+            if not asc or column.dtype.kind == 'f':
+                # Ranks of the distinct values (nan last), reversed for descending order except for nan
+                values, ranks = np.unique(column, return_inverse=True)
+                column = ranks.reshape(column.shape)
+                if not asc:
+                    m = values.size - 1 if values.dtype.kind == 'f' and values.size and np.isnan(values[-1]) else values.size
+                    column = np.where(column < m, m - 1 - column, column)
+            sort_keys.append(column)
+        # np.lexsort is stable and takes its primary key last
+        idxs = np.lexsort(sort_keys[::-1])
+        
+        self.index = idxs if self.index is None else self.index[idxs]
+        composed = {}
         for i in self.header:
-            self[i] = np.array(self[i])
-            self[i] = self[i][idxs]
-            self[i] = list(self[i])
+            pending = self._orders.get(i)
+            if pending is None:
+                self._orders[i] = idxs
+            else:
+                if id(pending) not in composed:
+                    composed[id(pending)] = pending[idxs]
+                self._orders[i] = composed[id(pending)]
+
+class GroupBy:
+    '''
+    Rows of a Dataset grouped by key columns (see Dataset.factorize).
+    
+    Aggregations run over all the groups at once: count, sum, mean and
+    variance with np.bincount on the group ids, min, max and integer sums
+    with reduceat over the rows ordered by group, and median by sorting
+    each column by value and then, stably, by group.
+    '''
+    FUNCTIONS = ('count', 'sum', 'mean', 'variance', 'std', 'min', 'max', 'median')
+    
+    def __init__(self, data: Dataset, keys):
+        self.data = data
+        self.group, self.keys = data.factorize(keys)
+        self.counts = np.bincount(self.group, minlength=len(self.keys))
+        self.starts = np.concatenate([[0], np.cumsum(self.counts)[:-1]])
+        self._order = None
+        
+    def __repr__(self):
+        return f"{len(self)} groups of {len(self.data)} rows by {', '.join(self.keys.header)}"
+    
+    def __len__(self):
+        return self.counts.size
+    
+    @property
+    def order(self) -> np.ndarray:
+        '''
+        Rows sorted by group (stable, so each group keeps the row order).
+        '''
+        if self._order is None:
+            self._order = self._sortByGroup(np.arange(len(self.data)))
+        return self._order
+    
+    def _sortByGroup(self, rows: np.ndarray) -> np.ndarray:
+        '''
+        Stable sort of rows by their group (a radix sort when the ids fit in 16 bits).
+        '''
+        group = self.group[rows]
+        if len(self) <= 2**16:
+            group = group.astype(np.uint16)
+        return rows[np.argsort(group, kind='stable')]
+    
+    def agg(self, functions: dict) -> Dataset:
+        '''
+        Aggregates columns over every group.
+
+        Parameters
+        ----------
+        functions : dict
+            Function name or list of names for each column, among count, sum,
+            mean, variance (sample variance), std, min, max and median.
+
+        Raises
+        ------
+        Exception
+            When a function is unknown.
+
+        Returns
+        -------
+        Dataset
+            One row per group (in the sorted order of the keys) with the key
+            columns and a column "<column>_<function>" per aggregation.
+
+        '''
+        result = {name: self.keys[name] for name in self.keys.header}
+        for name, names in functions.items():
+            names = [names] if isinstance(names, str) else list(names)
+            for function in names:
+                result[f"{name}_{function}"] = self.aggregate(name, function)
+        return Dataset(data=result)
+    
+    def aggregate(self, name: str, function: str) -> np.ndarray:
+        '''
+        Aggregates one column over every group.
+
+        Parameters
+        ----------
+        name : str
+            Column name.
+        function : str
+            One of the functions of agg.
+
+        Raises
+        ------
+        Exception
+            When function is unknown.
+
+        Returns
+        -------
+        np.ndarray
+            Value of each group, in the sorted order of the keys.
+
+        '''
+        if function not in self.FUNCTIONS:
+            raise Exception(f"Use one of the following functions: {', '.join(self.FUNCTIONS)}")
+        if function == 'count':
+            return self.counts
+        assert self.data.dtypes[name] != 'category', f"{name} is not a numeric column"
+        X = self.data[name]
+        if function == 'sum':
+            if X.dtype.kind == 'f':
+                return np.bincount(self.group, X, minlength=len(self))
+            return np.add.reduceat(X[self.order].astype(np.int64), self.starts) if len(self) else np.zeros(0, np.int64)
+        if function == 'mean':
+            return np.bincount(self.group, X, minlength=len(self)) / self.counts
+        if function in ('variance', 'std'):
+            # Deviations from the group means (two passes, no cancellation), nan for single rows
+            means = np.bincount(self.group, X, minlength=len(self)) / self.counts
+            M2 = np.bincount(self.group, (X - means[self.group])**2, minlength=len(self))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                variance = np.where(self.counts > 1, M2 / (self.counts - 1), np.nan)
+            return variance if function == 'variance' else np.sqrt(variance)
+        if len(self) == 0:
+            return np.zeros(0, X.dtype)
+        if function == 'min':
+            return np.minimum.reduceat(X[self.order], self.starts)
+        if function == 'max':
+            return np.maximum.reduceat(X[self.order], self.starts)
+        # Median: the middle one or two values of each group after sorting by value, then (stably) by group
+        ordered = X[self._sortByGroup(np.argsort(X))]
+        low = ordered[self.starts + (self.counts - 1) // 2]
+        high = ordered[self.starts + self.counts // 2]
+        return np.where(low == high, low, (low + high) / 2)
+
+class _LazyColumns(dict):
+    '''
+    Dictionary of columns that loads each missing column on first access.
+    '''
+    def __init__(self, loaders: dict):
+        super().__init__()
+        self.loaders = loaders
+    
+    def __missing__(self, name):
+        if name not in self.loaders:
+            raise KeyError(name)
+        column = self[name] = self.loaders.pop(name)()
+        return column
+
+_CACHE_VERSION = 1
+
+def cachePath(path: str) -> str:
+    '''
+    Directory holding the binary column cache of a csv file.
+    '''
+    return path + '.cache'
+
+def saveCache(dataset: Dataset, path: str, stat: os.stat_result= None) -> bool:
+    '''
+    Writes the columns of a dataset as a binary cache of the csv file at path.
+    
+    The cache is a directory next to the file with one .npy file per column
+    (plus one for the categories of categorical columns) and a schema.json
+    header holding the column names, their types and the size and modification
+    time of the csv file. The header is written last, so an interrupted write
+    is never read back. Every file is written under a temporary name and then
+    renamed over the old one, so datasets still memory-mapping the previous
+    cache keep reading the previous files.
+
+    Parameters
+    ----------
+    dataset : Dataset
+        
+    path : str
+        Path to the csv file the dataset was read from.
+    stat : os.stat_result, optional
+        Status of the csv file when it was read. The default is None (taken now).
+
+    Returns
+    -------
+    bool
+        False when the cache could not be written.
+
+    '''
+    directory = cachePath(path)
+    schema_path = os.path.join(directory, 'schema.json')
+    try:
+        os.makedirs(directory, exist_ok=True)
+        if os.path.exists(schema_path):
+            os.remove(schema_path)
+        for i, name in enumerate(dataset.header):
+            _replaceFile(os.path.join(directory, f'{i}.npy'), lambda file: np.save(file, dataset._stored(name)))
+            if dataset.dtypes[name] == 'category':
+                _replaceFile(os.path.join(directory, f'{i}.categories.npy'), lambda file: np.save(file, dataset.categories[name]))
+        if stat is None:
+            stat = os.stat(path)
+        schema = {'version': _CACHE_VERSION, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                  'header': dataset.header, 'dtypes': [dataset.dtypes[i] for i in dataset.header]}
+        _replaceFile(schema_path, lambda file: file.write(json.dumps(schema).encode()))
+    except OSError:
+        return False
+    return True
+
+def _replaceFile(target: str, write):
+    '''
+    Writes a file under a temporary name in its directory (write(file) fills
+    it) and renames it over target, which is never modified in place.
+    '''
+    fd, temp = tempfile.mkstemp(dir=os.path.dirname(target), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            write(file)
+        os.replace(temp, target)
+    except BaseException:
+        os.remove(temp)
+        raise
+
+def loadCache(path: str, dataset: Dataset) -> bool:
+    '''
+    Loads the binary cache of the csv file at path into an empty dataset.
+    
+    The cache is only used when it matches the current size and modification
+    time of the file. Columns are memory-mapped (zero-copy) the first time
+    they are accessed, untouched columns are never read.
+
+    Parameters
+    ----------
+    path : str
+        Path to the csv file.
+    dataset : Dataset
+        Empty dataset to fill.
+
+    Returns
+    -------
+    bool
+        False when there is no valid cache.
+
+    '''
+    directory = cachePath(path)
+    try:
+        with open(os.path.join(directory, 'schema.json')) as file:
+            schema = json.load(file)
+        stat = os.stat(path)
+    except (OSError, ValueError):
+        return False
+    if (schema.get('version'), schema.get('size'), schema.get('mtime_ns')) != (_CACHE_VERSION, stat.st_size, stat.st_mtime_ns):
+        return False
+    
+    load = lambda file: (lambda: np.load(os.path.join(directory, file), mmap_mode='r'))
+    dataset.header = list(schema['header'])
+    dataset.dtypes = dict(zip(dataset.header, schema['dtypes']))
+    dataset.data = _LazyColumns({name: load(f'{i}.npy') for i, name in enumerate(dataset.header)})
+    dataset.categories = _LazyColumns({name: load(f'{i}.categories.npy') for i, name in enumerate(dataset.header)
+                                       if dataset.dtypes[name] == 'category'})
+    return True
+
+def _denseCodes(column: np.ndarray) -> tuple:
+    '''
+    Sorted distinct values of a column and the position of each row in them.
+    
+    Integer and bool columns whose range is at most a few times their size are
+    offset by their minimum instead of sorted (the values then include the
+    integers missing from the column).
+    '''
+    if column.dtype.kind in 'iub' and column.size > 0:
+        low, high = int(column.min()), int(column.max())
+        if high - low < 4 * column.size:
+            return np.arange(low, high + 1).astype(column.dtype), column.astype(np.int64) - low
+    values, codes = np.unique(column, return_inverse=True)
+    return values, codes.ravel().astype(np.int64)
+
+def _renumber(codes: np.ndarray, size: int) -> tuple:
+    '''
+    Distinct values of codes (all in [0, size)) in increasing order and the
+    position of each code in them.
+    '''
+    if size <= 4 * codes.size + 1024:
+        used = np.flatnonzero(np.bincount(codes, minlength=size))
+        rank = np.zeros(size, dtype=np.int64)
+        rank[used] = np.arange(used.size)
+        return used, rank[codes]
+    used, inverse = np.unique(codes, return_inverse=True)
+    return used, inverse.ravel()
+
+def toColumn(values) -> tuple:
+    '''
+    Converts a sequence of values into a typed column.
+
+    Parameters
+    ----------
+    values : list or np.ndarray
+        Column values.
+
+    Returns
+    -------
+    tuple
+        Contiguous array, dtype name ('int64', 'float64', 'bool' or 'category')
+        and the array of categories (None for non categorical columns).
+
+    '''
+    values = np.asarray(values)
+    kind = values.dtype.kind
+    if kind == 'b':
+        return np.ascontiguousarray(values), 'bool', None
+    if kind in 'iu':
+        return np.ascontiguousarray(values, dtype=np.int64), 'int64', None
+    if kind == 'f':
+        return np.ascontiguousarray(values, dtype=np.float64), 'float64', None
+    categories, codes = np.unique(values.astype(str), return_inverse=True)
+    return codes.astype(np.int32).reshape(values.shape), 'category', categories
 
        
-def parseCsv(path: str) -> dict:
+class ParseError(ValueError):
     '''
+    Raised when a csv file cannot be parsed, carrying the position of the problem.
+    '''
+    def __init__(self, message: str, line: int, column: str= None):
+        self.line = line
+        self.column = column
+        position = f"line {line}" + (f", column {column!r}" if column is not None else '')
+        super().__init__(f"{position}: {message}")
+
+_rint = re.compile(r'[-+]? \d+', re.VERBOSE)
+_rfloat = re.compile(r'[-+]? (?: (?: \d* \. \d+ ) | (?: \d+ \.? ) )(?: [Ee] [+-]? \d+ ) ?', re.VERBOSE)
+_BOOLS = ('True', 'False')
+
+def inferType(sample: list) -> str:
+    '''
+    Infers the type of a column from a sample of its cells.
+
+    Parameters
+    ----------
+    sample : list
+        Strings from the column (empty cells are ignored).
+
+    Returns
+    -------
+    str
+        'int64', 'float64', 'bool' or 'category'.
+
+    '''
+    cells = [i for i in sample if i != '']
+    if not cells:
+        return 'category'
+    if all(_rint.fullmatch(i) for i in cells):
+        return 'float64' if len(cells) < len(sample) else 'int64'
+    if all(_rfloat.fullmatch(i) or i.lower() in ('nan', 'inf', '-inf') for i in cells):
+        return 'float64'
+    if all(i in _BOOLS for i in cells) and len(cells) == len(sample):
+        return 'bool'
+    return 'category'
+
+def convertColumn(cells: list, dtype: str) -> np.ndarray:
+    '''
+    Converts a whole column of strings with a single typed converter.
     
+    Empty cells of float columns become nan.
+
+    Parameters
+    ----------
+    cells : list
+        Strings from the column.
+    dtype : str
+        'int64', 'float64', 'bool' or 'category'.
+
+    Raises
+    ------
+    ValueError
+        When a cell can not be converted to dtype.
+
+    Returns
+    -------
+    np.ndarray
+        Converted values (strings are kept as a numpy str array).
+
+    '''
+    if dtype == 'int64':
+        try:
+            return np.array(cells, dtype=np.int64)
+        except OverflowError:
+            raise ValueError("integer out of range for int64") from None
+    if dtype == 'float64':
+        try:
+            return np.array(cells, dtype=np.float64)
+        except ValueError:
+            cells = np.array(cells, dtype=str)
+            return np.where(cells == '', 'nan', cells).astype(np.float64)
+    cells = np.array(cells, dtype=str)
+    if dtype == 'bool':
+        values = cells == 'True'
+        if not (values | (cells == 'False')).all():
+            raise ValueError("invalid literal for bool")
+        return values
+    return cells
+
+def _badCell(cells: list, dtype: str) -> int:
+    '''
+    Position of the first cell that convertColumn rejects.
+    '''
+    for i, cell in enumerate(cells):
+        try:
+            convertColumn([cell], dtype)
+        except ValueError:
+            return i
+    return None
+
+def parseCsv(path: str, block_size: int= 2**16, sample_size: int= 1000) -> dict:
+    '''
+    Parses a csv file into typed numpy columns.
+    
+    Rows are read in blocks, the type of each column is inferred from the
+    first sample_size rows and each block of a column is then converted at
+    once. An int column that later meets a float, an empty cell or an integer
+    too large for int64 is promoted to float, and a column that later meets
+    any other text becomes a category column (the values already converted
+    are turned back into text). Quoted fields follow the csv module conventions.
 
     Parameters
     ----------
     path : str
         Path to csv.
+    block_size : int, optional
+        Number of rows converted at once. The default is 2**16.
+    sample_size : int, optional
+        Number of rows used to infer the column types. The default is 1000.
+
+    Raises
+    ------
+    ParseError
+        When a row has the wrong number of fields or a quoted field is malformed.
 
     Returns
     -------
@@ -71,20 +662,64 @@ def parseCsv(path: str) -> dict:
         Dictionary containing parsed data.
 
     '''
-    file = open(path)
-    data = {}
-    headers = [i for i in file.readline().strip('\n').split(',')]
-    for i in headers:
-        data[i] = []
-    while True:
-        line = file.readline()
-        if line == '':
-            break
-        line = parseLine(line)
-        for i, h in enumerate(headers):
-            data[h].append(line[i])
+    with open(path, newline='', buffering=2**20) as file:
+        reader = csv.reader(file, strict=True)
+        try:
+            headers = next(reader)
+        except StopIteration:
+            return {}
+        except csv.Error as e:
+            raise ParseError(str(e), reader.line_num) from None
+        
+        dtypes = None
+        chunks = [[] for _ in headers]
+        while True:
+            first_line = reader.line_num + 1
+            try:
+                rows = list(itertools.islice(reader, block_size if dtypes else max(block_size, sample_size)))
+            except csv.Error as e:
+                raise ParseError(str(e), reader.line_num) from None
+            if not rows:
+                break
+            
+            if set(map(len, rows)) != {len(headers)}:
+                i = next(i for i, row in enumerate(rows) if len(row) != len(headers))
+                raise ParseError(f"expected {len(headers)} fields, found {len(rows[i])}", _lineOf(rows, i, first_line))
+            columns = list(zip(*rows))
+            if dtypes is None:
+                dtypes = [inferType(col[:sample_size]) for col in columns]
             
-    return data
+            for j, col in enumerate(columns):
+                try:
+                    chunks[j].append(convertColumn(col, dtypes[j]))
+                except ValueError:
+                    if dtypes[j] == 'int64' and _badCell(col, 'float64') is None:
+                        dtypes[j] = 'float64'
+                    else:
+                        dtypes[j] = 'category'
+                    chunks[j] = [_recast(c, dtypes[j]) for c in chunks[j]]
+                    chunks[j].append(convertColumn(col, dtypes[j]))
+    
+    if dtypes is None:
+        return {h: np.array([], dtype=str) for h in headers}
+    return {h: np.concatenate(chunks[j]) for j, h in enumerate(headers)}
+
+def _recast(values: np.ndarray, dtype: str) -> np.ndarray:
+    '''
+    Converted cells promoted to float64, or turned back into text for a category column.
+    '''
+    if dtype == 'float64':
+        return values.astype(np.float64)
+    text = values.astype(str)
+    if values.dtype.kind == 'f':
+        text[np.isnan(values)] = ''
+    return text
+
+def _lineOf(rows: list, i: int, first_line: int) -> int:
+    '''
+    Line number of rows[i] in the file, accounting for line breaks inside quoted fields.
+    '''
+    return first_line + i + sum(field.count('\n') for row in rows[:i] for field in row)
         
 def parseLine(line: str) -> list:
     '''
@@ -102,19 +737,14 @@ def parseLine(line: str) -> list:
         Parsed values.
 
     '''
-    line = [i for i in line.strip('\n').split(',')]
+    line = next(csv.reader([line.strip('\n')]))
     line_parsed = []
     for substring in line:
-        rfloat = re.compile('[-+]? (?: (?: \d* \. \d+ ) | (?: \d+ \.? ) )(?: [Ee] [+-]? \d+ ) ?', re.VERBOSE)
-        if bool(rfloat.match(substring)):
-            if substring.isdigit():
-                substring = int(substring)
-            else:
-                substring = float(substring)
-        elif substring in ['True', 'False']:
-            substring = int(bool(substring))
+        if _rint.fullmatch(substring):
+            substring = int(substring)
+        elif _rfloat.fullmatch(substring):
+            substring = float(substring)
+        elif substring in _BOOLS:
+            substring = substring == 'True'
         line_parsed.append(substring)
     return line_parsed
-        
-        
-        
\ No newline at end of file
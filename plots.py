@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+Headless batch rendering of distribution and column plots.
+
+The charts are drawn on a single matplotlib Figure with the non-interactive
+Agg canvas (pyplot is never imported, so no window or GUI backend is
+involved), cleared and reused for every chart of the batch, and each one is
+written to a PNG or SVG file.
+"""
+import os
+import re
+from statistics import plotHistogram, plotBox
+
+def renderBatch(jobs, directory: str, fmt: str= 'png', figsize: tuple= (6.4, 4.8), dpi: int= 100) -> list:
+    '''
+    Renders a batch of charts to files, reusing one figure.
+
+    Parameters
+    ----------
+    jobs : iterable
+        Pairs (name, draw) where draw(axis) draws a chart on a matplotlib axis,
+        such as the plot methods of the distributions or the plot functions of
+        statistics (all accept an axis).
+    directory : str
+        Output directory, created if needed.
+    fmt : str, optional
+        'png' or 'svg'. The default is 'png'.
+    figsize : tuple, optional
+        Figure size in inches. The default is (6.4, 4.8).
+    dpi : int, optional
+        Resolution of the png files. The default is 100.
+
+    Returns
+    -------
+    list
+        Paths of the written files.
+
+    '''
+    assert fmt in ('png', 'svg'), "The format must be png or svg"
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    os.makedirs(directory, exist_ok=True)
+    figure = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(figure)
+    paths = []
+    for name, draw in jobs:
+        figure.clear()
+        draw(figure.add_subplot())
+        path = os.path.join(directory, f"{fileName(name)}.{fmt}")
+        figure.savefig(path, format=fmt)
+        paths.append(path)
+    return paths
+
+def renderDistributions(dists: list, directory: str, names: list= None, **kwargs) -> list:
+    '''
+    Renders the plot of each distribution to a file.
+
+    Parameters
+    ----------
+    dists : list
+        Distributions (anything with a plot(axis=...) method).
+    directory : str
+        Output directory.
+    names : list, optional
+        File names. The default is the index of each distribution.
+    **kwargs
+        Options of renderBatch.
+
+    Returns
+    -------
+    list
+        Paths of the written files.
+
+    '''
+    if names is None:
+        names = [str(i) for i in range(len(dists))]
+    assert len(names) == len(dists), "There must be a name for each distribution"
+    jobs = ((name, lambda axis, dist=dist: dist.plot(axis=axis)) for name, dist in zip(names, dists))
+    return renderBatch(jobs, directory, **kwargs)
+
+def renderColumns(data, directory: str, names: list= None, kind: str= 'hist', **kwargs) -> list:
+    '''
+    Renders a histogram or box plot of each column of a dataset to a file.
+
+    Parameters
+    ----------
+    data : Dataset
+
+    directory : str
+        Output directory.
+    names : list, optional
+        Columns to render. The default is every numeric column.
+    kind : str, optional
+        'hist' or 'box'. The default is 'hist'.
+    **kwargs
+        Options of renderBatch.
+
+    Returns
+    -------
+    list
+        Paths of the written files, named after the columns.
+
+    '''
+    if names is None:
+        names = data.numeric()
+    if kind == 'hist':
+        draw = lambda name: lambda axis: plotHistogram(data, name, axis=axis)
+    elif kind == 'box':
+        draw = lambda name: lambda axis: plotBox(data[name], title=name, axis=axis)
+    else:
+        raise Exception("kind must be 'hist' or 'box'")
+    return renderBatch(((name, draw(name)) for name in names), directory, **kwargs)
+
+def fileName(name) -> str:
+    '''
+    Name made safe for a file name (runs of other characters become _).
+    '''
+    return re.sub(r'[^\w.-]+', '_', str(name))
@@ -4,11 +4,10 @@ Created on Fri Aug 20 07:50:21 2021
 
 @author: Gabriel
 """
-from utils import C, integral, summation, fact, generate_range, ceil
+from utils import C, P, ceil, erfc, lgamma, betainc, gammainc, gammaincc, logC, stirlerr, bd0, xlogy, logsumexp, pyplot, plotAxis
 import numpy as np
-from math import gamma
-from scipy.special import hyp2f1
-import matplotlib.pyplot as plt
+import itertools
+from abc import ABC, abstractmethod
 
 # Basic concepts
 
@@ -17,27 +16,151 @@ class SampleSpace:
     Defines a sample space for an arbitrary random experiment.
     
     It is expected that strings or numbers as well as tuples of those are used to define the elements of the set.
+    Each element gets a stable index (its position in sorted order when the
+    elements can be sorted), which is the bit representing it in the events.
     '''
     def __init__(self, data: set):
         self.elements = data
         self.cardinality = len(self.elements)
+        try:
+            self.order = sorted(self.elements)
+        except TypeError:
+            self.order = list(self.elements)
+        self.index = {e: i for i, e in enumerate(self.order)}
+        self.words = -(-self.cardinality // 64)
+        self.full = _bitmask(np.arange(self.cardinality), self.words)
     
     def __repr__(self):
         return f"{self.elements}"
     
+    def mask(self, data: set) -> np.ndarray:
+        '''
+        Packed bitmask (array of uint64 words) of a subset of the sample space.
+
+        Parameters
+        ----------
+        data : set
+            Elements of the sample space.
+
+        Raises
+        ------
+        KeyError
+            When an element is not in the sample space.
+
+        Returns
+        -------
+        np.ndarray
+            Bit i is set when the element with index i is in data.
+
+        '''
+        idxs = np.fromiter((self.index[e] for e in data), np.int64, len(data))
+        return _bitmask(idxs, self.words)
+    
 class Event:
     '''
     Defines a subset of a sample space.
     
+    The event is stored as a packed bitmask over the indices of the sample space,
+    so union (|), intersection (&), complement (~), difference (-), subset and
+    disjointness tests are word-wise operations.
     '''
     def __init__(self, data: set, sample_space: SampleSpace):
-        self.elements = data
-        self.cardinality = len(self.elements)
-        assert self.isSubset(sample_space), "The event must be a subset of the sample space."
+        try:
+            mask = sample_space.mask(data)
+        except KeyError:
+            raise AssertionError("The event must be a subset of the sample space.") from None
+        self._setMask(mask, sample_space)
+        self._elements = data
+    
+    @classmethod
+    def fromMask(cls, mask: np.ndarray, sample_space: SampleSpace):
+        '''
+        Builds an event directly from its bitmask.
+
+        Parameters
+        ----------
+        mask : np.ndarray
+            Packed bitmask, as returned by SampleSpace.mask.
+        sample_space : SampleSpace
+            
+
+        Returns
+        -------
+        Event
+            
+
+        '''
+        event = cls.__new__(cls)
+        event._setMask(mask, sample_space)
+        event._elements = None
+        return event
+    
+    def _setMask(self, mask: np.ndarray, sample_space: SampleSpace):
+        self.mask = mask
         self.sample_space = sample_space
+        self.cardinality = _popcount(mask)
+    
+    @property
+    def elements(self) -> set:
+        '''
+        Elements of the event (decoded from the bitmask when needed).
+        '''
+        if self._elements is None:
+            bits = np.unpackbits(self.mask.view(np.uint8), bitorder='little')
+            self._elements = {self.sample_space.order[i] for i in np.flatnonzero(bits)}
+        return self._elements
+    
+    def __repr__(self):
+        return f"{self.elements}"
+    
+    def __and__(self, other):
+        return Event.fromMask(self.mask & _sameSpace(self, other).mask, self.sample_space)
+    
+    def __or__(self, other):
+        return Event.fromMask(self.mask | _sameSpace(self, other).mask, self.sample_space)
+    
+    def __sub__(self, other):
+        return Event.fromMask(self.mask & ~_sameSpace(self, other).mask, self.sample_space)
+    
+    def __invert__(self):
+        return Event.fromMask(~self.mask & self.sample_space.full, self.sample_space)
         
-    def isSubset(self, Omega: SampleSpace) -> bool:
-        return all([i in Omega.elements for i in self.elements])
+    def isSubset(self, Omega) -> bool:
+        '''
+        True if the event is contained in Omega (a sample space or another event).
+        '''
+        if isinstance(Omega, SampleSpace):
+            return Omega is self.sample_space or all([i in Omega.elements for i in self.elements])
+        return not (self.mask & ~_sameSpace(self, Omega).mask).any()
+    
+    def isDisjoint(self, other) -> bool:
+        '''
+        True if the events have no element in common.
+        '''
+        return not (self.mask & _sameSpace(self, other).mask).any()
+
+def _bitmask(idxs: np.ndarray, words: int) -> np.ndarray:
+    '''
+    Packs a set of indices into an array of uint64 words.
+    '''
+    bits = np.zeros(words * 64, dtype=bool)
+    bits[idxs] = True
+    return np.packbits(bits, bitorder='little').view('<u8')
+
+def _popcount(words: np.ndarray) -> int:
+    '''
+    Number of bits set in an array of words.
+    '''
+    if hasattr(np, 'bitwise_count'):
+        return int(np.bitwise_count(words).sum())
+    return int(np.unpackbits(words.view(np.uint8)).sum())
+
+def _sameSpace(A: Event, B: Event) -> Event:
+    '''
+    Returns B after checking that it shares the sample space of A.
+    '''
+    assert A.sample_space is B.sample_space, "The events must be from the same sample space"
+    return B
 
 def prob(event: Event) -> float:
     '''
@@ -60,7 +183,7 @@ def prob(event: Event) -> float:
     
 def probGiven(A: Event, B: Event) -> float:
     '''
-    P(A|B) = NCF(A) / NCF(B)
+    P(A|B) = NCF(A and B) / NCF(B)
     where,
      - NFC : Number of favorable cases to the event
      
@@ -77,8 +200,7 @@ def probGiven(A: Event, B: Event) -> float:
         P(A|B).
 
     '''
-    assert B.isSubset(A.sample_space), "The events must be from the same sample space"
-    return A.cardinality / B.cardinality 
+    return (A & B).cardinality / B.cardinality 
 
 def probOr(A: Event, B: Event) -> float:
     '''
@@ -97,7 +219,7 @@ def probOr(A: Event, B: Event) -> float:
         P(A or B).
 
     '''
-    return np.round(prob(A) + prob(B) - probAnd(A, B), 4)
+    return np.round((A | B).cardinality / A.sample_space.cardinality, 4)
 
 def probAnd(A: Event, B: Event) -> float:
     '''
@@ -116,7 +238,7 @@ def probAnd(A: Event, B: Event) -> float:
         P(A and B).
 
     '''
-    return np.round(prob(B) * probGiven(A, B), 4)
+    return np.round((A & B).cardinality / A.sample_space.cardinality, 4)
 
 def checkDisjointUnion(P: list) -> bool:
     '''
@@ -125,7 +247,7 @@ def checkDisjointUnion(P: list) -> bool:
     Parameters
     ----------
     P : list
-        List of events.
+        List of events (or of sets).
 
     Returns
     -------
@@ -133,12 +255,344 @@ def checkDisjointUnion(P: list) -> bool:
         Is disjoint union
 
     '''
+    if all(isinstance(E, Event) for E in P):
+        masks = np.stack([_sameSpace(P[0], E).mask for E in P])
+        return sum([E.cardinality for E in P]) == _popcount(np.bitwise_or.reduce(masks, axis=0))
     sum1 = sum([len(E) for E in P])
     union = P[0]
     for i in range(1, len(P)):
         union = union.union(P[i])
     return sum1 == len(union)            
             
+# Bayes' rule
+
+def totalProbability(priors, likelihoods, log: bool= False):
+    '''
+    P(D) = sum_i P(D|H_i) P(H_i), for a partition H_1, ..., H_k.
+
+    Parameters
+    ----------
+    priors : list
+        P(H_i), shape (k,).
+    likelihoods : np.ndarray
+        P(D|H_i) for one observation, shape (k,), or for many, shape (n, k).
+    log : bool, optional
+        If True the likelihoods are given, and P(D) returned, in log space. The default is False.
+
+    Returns
+    -------
+    float or np.ndarray
+        P(D) (one value per observation).
+
+    '''
+    priors, likelihoods = _checkBayes(priors, likelihoods, log)
+    with np.errstate(divide='ignore'):
+        evidence = logsumexp(likelihoods + np.log(priors))
+    return evidence if log else np.exp(evidence)
+
+def bayesUpdate(priors, likelihoods, partition: list= None, log: bool= False, sequential: bool= False) -> np.ndarray:
+    '''
+    P(H_i|D) = P(D|H_i) P(H_i) / P(D), for a partition H_1, ..., H_k.
+    
+    Works in log space on whole arrays: thousands of hypotheses and millions
+    of observations are updated with a few numpy operations.
+
+    Parameters
+    ----------
+    priors : list
+        P(H_i), shape (k,), must add up to 1.
+    likelihoods : np.ndarray
+        P(D|H_i) for one observation, shape (k,), or for many, shape (n, k).
+    partition : list, optional
+        Events H_1, ..., H_k, checked to be disjoint (checkDisjointUnion). The default is None.
+    log : bool, optional
+        If True the likelihoods are given in log space. The default is False.
+    sequential : bool, optional
+        If False every observation gets its own posterior, shape (n, k).
+        If True the observations are taken as conditionally independent and
+        applied one after the other, giving the final posterior, shape (k,).
+        The default is False.
+
+    Returns
+    -------
+    np.ndarray
+        Posteriors P(H_i|D).
+
+    '''
+    priors, likelihoods = _checkBayes(priors, likelihoods, log)
+    if partition is not None:
+        assert len(partition) == priors.size, "Give one prior per event of the partition"
+        assert checkDisjointUnion(partition), "The events of the partition must be disjoint"
+    if sequential and likelihoods.ndim > 1:
+        likelihoods = likelihoods.sum(axis=0)
+    with np.errstate(divide='ignore'):
+        log_joint = likelihoods + np.log(priors)
+    return np.exp(log_joint - logsumexp(log_joint)[..., None])
+
+def _checkBayes(priors, likelihoods, log: bool) -> tuple:
+    '''
+    Validates priors and likelihoods, returning them as arrays with the likelihoods in log space.
+    '''
+    priors = np.asarray(priors, dtype=float)
+    likelihoods = np.asarray(likelihoods, dtype=float)
+    assert priors.ndim == 1 and likelihoods.shape[-1] == priors.size, "Give one likelihood per hypothesis"
+    assert (priors >= 0).all() and np.isclose(priors.sum(), 1), "The priors must be a probability distribution"
+    if not log:
+        assert (likelihoods >= 0).all(), "Likelihoods must be non negative"
+        with np.errstate(divide='ignore'):
+            likelihoods = np.log(likelihoods)
+    return priors, likelihoods
+
+# Lazy sample spaces
+
+class LazySampleSpace(ABC):
+    '''
+    Sample space whose elements are never materialized.
+    
+    The cardinality is obtained by counting (it is an exact int, even for
+    spaces far too large to enumerate) and the elements can be streamed by
+    iterating over the space. Events are defined with where (a predicate) or
+    exactly (a count of positions satisfying a condition).
+    '''
+    @abstractmethod
+    def __iter__(self):
+        pass
+    
+    @abstractmethod
+    def __contains__(self, outcome) -> bool:
+        pass
+    
+    @abstractmethod
+    def sample(self, size: int, rng= None) -> list:
+        '''
+        Draws outcomes uniformly at random.
+
+        Parameters
+        ----------
+        size : int
+            Number of outcomes.
+        rng : np.random.Generator or int, optional
+            Generator or seed. The default is None.
+
+        Returns
+        -------
+        list
+            List of outcomes (tuples).
+
+        '''
+    
+    @abstractmethod
+    def _countExactly(self, condition, k: int) -> int:
+        '''
+        Number of outcomes where exactly k positions satisfy condition.
+        '''
+    
+    def where(self, predicate, cardinality: int= None):
+        '''
+        Event made of the outcomes satisfying a predicate.
+
+        Parameters
+        ----------
+        predicate : function
+            Function of an outcome returning a bool.
+        cardinality : int, optional
+            Number of outcomes satisfying the predicate, when it is known in
+            closed form. The default is None (counted by enumeration when needed).
+
+        Returns
+        -------
+        PredicateEvent
+            
+
+        '''
+        return PredicateEvent(predicate, self, cardinality)
+    
+    def exactly(self, condition, k: int):
+        '''
+        Event "exactly k positions of the outcome satisfy condition" (e.g. exactly
+        two sixes in 20 dice), with its cardinality computed by counting.
+
+        Parameters
+        ----------
+        condition : function
+            Function of a single value returning a bool.
+        k : int
+            Number of positions.
+
+        Returns
+        -------
+        PredicateEvent
+            
+
+        '''
+        predicate = lambda outcome: sum(1 for i in outcome if condition(i)) == k
+        return PredicateEvent(predicate, self, self._countExactly(condition, k))
+
+class ProductSpace(LazySampleSpace):
+    '''
+    Cartesian product of sets (e.g. 20 dice rolls), outcomes are tuples.
+    '''
+    def __init__(self, factors: list, repeat: int= 1):
+        '''
+        
+
+        Parameters
+        ----------
+        factors : list
+            List of sets.
+        repeat : int, optional
+            Number of times the factors are repeated. The default is 1.
+
+        Returns
+        -------
+        None.
+
+        '''
+        self.factors = [list(f) for f in factors] * repeat
+        self.cardinality = 1
+        for f in self.factors:
+            self.cardinality *= len(f)
+    
+    def __repr__(self):
+        return f"Product of {len(self.factors)} sets with {self.cardinality} outcomes"
+    
+    def __iter__(self):
+        return itertools.product(*self.factors)
+    
+    def sample(self, size: int, rng= None) -> list:
+        rng = np.random.default_rng(rng)
+        columns = [[f[i] for i in rng.integers(len(f), size=size).tolist()] for f in self.factors]
+        return list(zip(*columns))
+    
+    def __contains__(self, outcome) -> bool:
+        return len(outcome) == len(self.factors) and all(i in f for i, f in zip(outcome, self.factors))
+    
+    def _countExactly(self, condition, k: int) -> int:
+        # Coefficient of z^k in the product over the positions of (misses + hits z)
+        poly = [1]
+        for f in self.factors:
+            hits = sum(1 for i in f if condition(i))
+            misses = len(f) - hits
+            poly = [(poly[j] if j < len(poly) else 0) * misses + (poly[j - 1] * hits if j > 0 else 0)
+                    for j in range(len(poly) + 1)]
+        return poly[k] if 0 <= k < len(poly) else 0
+
+class CombinationSpace(LazySampleSpace):
+    '''
+    All subsets of size r of a set (e.g. 5 card hands), outcomes are tuples
+    in the order the elements were given.
+    '''
+    def __init__(self, elements: list, r: int):
+        self.elements = list(elements)
+        self.r = r
+        self.cardinality = C(len(self.elements), r)
+    
+    def __repr__(self):
+        return f"Combinations of {len(self.elements)} elements taken {self.r} at a time with {self.cardinality} outcomes"
+    
+    def __iter__(self):
+        return itertools.combinations(self.elements, self.r)
+    
+    def sample(self, size: int, rng= None) -> list:
+        rng = np.random.default_rng(rng)
+        # The first r positions of a random ordering of the elements, kept in the given order
+        idxs = np.sort(np.argsort(rng.random((size, len(self.elements))), axis=1)[:, :self.r], axis=1)
+        return [tuple(self.elements[i] for i in row) for row in idxs.tolist()]
+    
+    def __contains__(self, outcome) -> bool:
+        return len(outcome) == self.r == len(set(outcome)) and all(i in self.elements for i in outcome)
+    
+    def _countExactly(self, condition, k: int) -> int:
+        hits = sum(1 for i in self.elements if condition(i))
+        misses = len(self.elements) - hits
+        if not (0 <= k <= hits and 0 <= self.r - k <= misses):
+            return 0
+        return C(hits, k) * C(misses, self.r - k)
+
+class PermutationSpace(CombinationSpace):
+    '''
+    All ordered arrangements of r distinct elements of a set, outcomes are tuples.
+    '''
+    def __init__(self, elements: list, r: int):
+        super().__init__(elements, r)
+        self.cardinality = P(len(self.elements), r)
+    
+    def __repr__(self):
+        return f"Permutations of {len(self.elements)} elements taken {self.r} at a time with {self.cardinality} outcomes"
+    
+    def __iter__(self):
+        return itertools.permutations(self.elements, self.r)
+    
+    def sample(self, size: int, rng= None) -> list:
+        rng = np.random.default_rng(rng)
+        idxs = np.argsort(rng.random((size, len(self.elements))), axis=1)[:, :self.r]
+        return [tuple(self.elements[i] for i in row) for row in idxs.tolist()]
+    
+    def _countExactly(self, condition, k: int) -> int:
+        return super()._countExactly(condition, k) * P(self.r, self.r)
+
+class PredicateEvent:
+    '''
+    Event of a lazy sample space, defined by a predicate over its outcomes.
+    
+    When its cardinality is not given in closed form it is counted by streaming
+    the sample space (only once, the result is cached).
+    '''
+    def __init__(self, predicate, sample_space: LazySampleSpace, cardinality: int= None):
+        self.predicate = predicate
+        self.sample_space = sample_space
+        self._cardinality = cardinality
+    
+    def __repr__(self):
+        return f"Event over {self.sample_space}"
+    
+    def __contains__(self, outcome) -> bool:
+        return outcome in self.sample_space and self.predicate(outcome)
+    
+    @property
+    def cardinality(self) -> int:
+        if self._cardinality is None:
+            self._cardinality = self.count()
+        return self._cardinality
+    
+    def count(self, limit: int= None, max_outcomes: int= None) -> int:
+        '''
+        Counts the outcomes in the event by streaming the sample space.
+
+        Parameters
+        ----------
+        limit : int, optional
+            Stop as soon as this many outcomes were found. The default is None.
+        max_outcomes : int, optional
+            Stop after looking at this many outcomes. The default is None.
+
+        Returns
+        -------
+        int
+            Number of outcomes found (exact when no early stop happened).
+
+        '''
+        outcomes = itertools.islice(self.sample_space, max_outcomes)
+        found = 0
+        for outcome in outcomes:
+            if self.predicate(outcome):
+                found += 1
+                if found == limit:
+                    break
+        return found
+    
+    def __and__(self, other):
+        _sameSpace(self, other)
+        return PredicateEvent(lambda x: self.predicate(x) and other.predicate(x), self.sample_space)
+    
+    def __or__(self, other):
+        _sameSpace(self, other)
+        return PredicateEvent(lambda x: self.predicate(x) or other.predicate(x), self.sample_space)
+    
+    def __invert__(self):
+        cardinality = None if self._cardinality is None else self.sample_space.cardinality - self._cardinality
+        return PredicateEvent(lambda x: not self.predicate(x), self.sample_space, cardinality)
+    
 # Probability distributions
 
 class DiscreteDistribution:
@@ -148,6 +602,10 @@ class DiscreteDistribution:
     Each one can be called returning the probability of assuming value x,
     each one has the mean and variance (var) available.
     A cdf method is also available and calculate F(X <= x).
+    
+    Both the call and the cdf accept a scalar, a list or a numpy array of values,
+    arrays are evaluated elementwise in a single pass and return arrays.
+    Samples are drawn with rvs.
     '''
     
     class Bernoulli:
@@ -167,24 +625,42 @@ class DiscreteDistribution:
             return f"Bernoulli with probability {self.p} \nmean = {self.mean} and variance = {self.var}"
         
         def __call__(self, x: int) -> float:
-            if not(x in (0, 1)):
+            x = np.asarray(x)
+            if not np.isin(x, (0, 1)).all():
                 raise Exception("Invalid outcome for a bernoulli trial (x must be binary)")
-            return self.p**x * self.q**(1 - x)
+            return np.asarray(self.p**x * self.q**(1 - x))[()]
         
         def cdf(self, x: int) -> float:
-            if x < 0:
-                return 0
-            elif x >= 1:
-                return 1
-            else:
-                return self.q
-        
-        def plot(self):
-            figure = plt.figure()
-            axis = figure.add_subplot()
-            plt.scatter([0, 1], [self.q, self.p])
+            x = np.asarray(x)
+            return np.where(x < 0, 0, np.where(x >= 1, 1, self.q))[()]
+        
+        def rvs(self, size= None, rng= None) -> np.ndarray:
+            '''
+            Draws samples by comparing uniforms with p.
+
+            Parameters
+            ----------
+            size : int or tuple, optional
+                Shape of the output. The default is None (a single sample).
+            rng : np.random.Generator or int, optional
+                Generator or seed. The default is None (fresh entropy).
+
+            Returns
+            -------
+            np.ndarray
+                Samples.
+
+            '''
+            rng = np.random.default_rng(rng)
+            return np.asarray(rng.random(size) < self.p, dtype=np.int64)[()]
+        
+        def plot(self, axis= None):
+            axis, show = plotAxis(axis)
+            axis.scatter([0, 1], [self.q, self.p])
             axis.set_ylim([-0.025, 1])
-            plt.show()
+            if show:
+                pyplot().show()
+            return axis
         
     class Binomial:
         '''
@@ -205,26 +681,63 @@ class DiscreteDistribution:
                      \nmean = {self.mean} and variance = {self.var}"
         
         def __call__(self, x: int) -> float:
-            if not(x in range(self.n+1)):
+            x = np.asarray(x)
+            if not ((x >= 0) & (x <= self.n) & (x == np.floor(x))).all():
                 raise Exception(f"x must be in [0, {self.n}] range")
-            return np.round(C(self.n, x) * self.p**x * self.q**(self.n-x), 4)
+            x = x.astype(int)
+            log_pmf = logC(self.n, x) + xlogy(x, self.p) + xlogy(self.n - x, self.q)
+            return np.exp(log_pmf)[()]
         
         def cdf(self, x: int) -> float:
-            if x < 0:
-                return 0
-            elif x >= self.n:
-                return 1
-            else:
-                f = lambda t: (t**(self.n - x - 1)) * (1 - t)**x
-                return np.round((self.n - x) * C(self.n, x) * integral(f, 0, self.q, 10**5), 4)
-        
-        def plot(self):
-            figure = plt.figure()
-            axis = figure.add_subplot()
-            to_plot = [i for i in range(self.n+1)]
-            plt.scatter(to_plot, [self(i) for i in to_plot])
+            '''
+            F(X <= x) = I_q(n - x, x + 1), the regularized incomplete beta function.
+            '''
+            x = np.floor(np.asarray(x, dtype=float))
+            inside = (x >= 0) & (x < self.n)
+            F = np.where(x >= self.n, 1.0, 0.0)
+            F[inside] = betainc(self.n - x[inside], x[inside] + 1, self.q)
+            return F[()]
+        
+        def sf(self, x: int) -> float:
+            '''
+            Survival function, F(X > x) = I_p(x + 1, n - x).
+            
+            Computed directly instead of 1 - cdf(x) so the upper tail keeps full precision.
+            '''
+            x = np.floor(np.asarray(x, dtype=float))
+            inside = (x >= 0) & (x < self.n)
+            S = np.where(x < 0, 1.0, 0.0)
+            S[inside] = betainc(x[inside] + 1, self.n - x[inside], self.p)
+            return S[()]
+        
+        def rvs(self, size= None, rng= None) -> np.ndarray:
+            '''
+            Draws samples with numpy's BTPE binomial generator.
+
+            Parameters
+            ----------
+            size : int or tuple, optional
+                Shape of the output. The default is None (a single sample).
+            rng : np.random.Generator or int, optional
+                Generator or seed. The default is None (fresh entropy).
+
+            Returns
+            -------
+            np.ndarray
+                Samples.
+
+            '''
+            rng = np.random.default_rng(rng)
+            return rng.binomial(self.n, self.p, size)
+        
+        def plot(self, axis= None):
+            axis, show = plotAxis(axis)
+            to_plot = np.arange(self.n + 1)
+            axis.scatter(to_plot, self(to_plot))
             axis.set_ylim([-0.025, 1])
-            plt.show()
+            if show:
+                pyplot().show()
+            return axis
     
     class Geometric:
         '''
@@ -244,24 +757,46 @@ class DiscreteDistribution:
                      \nmean = {self.mean} and variance = {self.var}"
         
         def __call__(self, x: int) -> float:
-            if not(x >= 0):
+            x = np.asarray(x)
+            if not (x >= 0).all():
                 raise Exception("x must be greater or equal to 0")
-            return np.round(self.p * (self.q**x), 4)
+            return np.round(self.p * (self.q**x), 4)[()]
         
         def cdf(self, x: int) -> float:
-            if x < 0:
-                return 0
-            else:
-                return np.round(1 - self.q**(x + 1), 4)
-        
-        def plot(self):
-            figure = plt.figure()
-            axis = figure.add_subplot()
-            to_plot = [i for i in range(30)]
-            probs = [self(i) for i in to_plot]
-            plt.scatter(to_plot, probs)
-            axis.set_ylim([-0.025, min(1, max(probs) + 0.1)])
-            plt.show()
+            x = np.floor(np.asarray(x, dtype=float))
+            F = 1 - self.q**(np.maximum(x, -1) + 1)
+            return np.round(np.where(x < 0, 0, F), 4)[()]
+        
+        def rvs(self, size= None, rng= None) -> np.ndarray:
+            '''
+            Draws samples by inversion, floor(log(U) / log(q)).
+
+            Parameters
+            ----------
+            size : int or tuple, optional
+                Shape of the output. The default is None (a single sample).
+            rng : np.random.Generator or int, optional
+                Generator or seed. The default is None (fresh entropy).
+
+            Returns
+            -------
+            np.ndarray
+                Samples.
+
+            '''
+            rng = np.random.default_rng(rng)
+            with np.errstate(divide='ignore'):
+                return np.floor(np.log(1 - rng.random(size)) / np.log1p(-self.p)).astype(np.int64)
+        
+        def plot(self, axis= None):
+            axis, show = plotAxis(axis)
+            to_plot = np.arange(30)
+            probs = self(to_plot)
+            axis.scatter(to_plot, probs)
+            axis.set_ylim([-0.025, min(1, probs.max() + 0.1)])
+            if show:
+                pyplot().show()
+            return axis
     
     class Poisson:
         '''
@@ -280,26 +815,84 @@ class DiscreteDistribution:
                      \nmean = {self.mean} and variance = {self.var}"
         
         def __call__(self, x: int) -> float:
-            if not(x >= 0):
+            return np.exp(self.logpmf(x))
+        
+        def logpmf(self, x: int) -> float:
+            '''
+            Natural logarithm of the pmf, in the saddle point form of Loader
+            
+            log p(x) = -stirlerr(x) - bd0(x, lam) - log(2 pi x) / 2
+            
+            which avoids the cancellation of x log(lam) - lam - log(x!) for large lam.
+            '''
+            x = np.asarray(x)
+            if not (x >= 0).all():
                 raise Exception("x must be greater or equal to 0")
-            return np.round((((self.lam**x) * (np.e**(-self.lam))) / fact(x)), 4)
+            x = np.floor(x).astype(float)
+            L = np.full(x.shape, -float(self.lam))
+            positive = x > 0
+            xp = x[positive]
+            L[positive] = -stirlerr(xp) - bd0(xp, self.lam) - 0.5 * np.log(2 * np.pi * xp)
+            return L[()]
         
         def cdf(self, x: int) -> float:
-            if x < 0:
-                return 0
-            else:
-                return np.round(summation(self, 0, x) , 4)
+            '''
+            F(X <= x) = Q(x + 1, lam), the regularized upper incomplete gamma function.
+            '''
+            x = np.floor(np.asarray(x, dtype=float))
+            inside = x >= 0
+            F = np.zeros(x.shape)
+            # Counts repeat a lot, evaluate each distinct one once
+            k, inverse = np.unique(x[inside], return_inverse=True)
+            F[inside] = gammaincc(k + 1, self.lam)[inverse]
+            return F[()]
         
-        def plot(self, max_x: int= None):
-            if max_x == None:
-                max_x = self.lam * 3
-            figure = plt.figure()
-            axis = figure.add_subplot()
-            to_plot = [i for i in range(max_x)]
-            probs = [self(i) for i in to_plot]
-            plt.scatter(to_plot, probs)
-            axis.set_ylim([-0.025, min(1, max(probs) + 0.1)])
-            plt.show()
+        def sf(self, x: int) -> float:
+            '''
+            Survival function, F(X > x) = P(x + 1, lam).
+            
+            Computed directly instead of 1 - cdf(x) so the upper tail keeps full precision.
+            '''
+            x = np.floor(np.asarray(x, dtype=float))
+            inside = x >= 0
+            S = np.ones(x.shape)
+            k, inverse = np.unique(x[inside], return_inverse=True)
+            S[inside] = gammainc(k + 1, self.lam)[inverse]
+            return S[()]
+        
+        def rvs(self, size= None, rng= None) -> np.ndarray:
+            '''
+            Draws samples with numpy's Poisson generator (PTRS for large lambda).
+
+            Parameters
+            ----------
+            size : int or tuple, optional
+                Shape of the output. The default is None (a single sample).
+            rng : np.random.Generator or int, optional
+                Generator or seed. The default is None (fresh entropy).
+
+            Returns
+            -------
+            np.ndarray
+                Samples.
+
+            '''
+            rng = np.random.default_rng(rng)
+            return rng.poisson(self.lam, size)
+        
+        def plot(self, max_x: int= None, axis= None):
+            axis, show = plotAxis(axis)
+            # Almost all of the mass is within 7 standard deviations of lam
+            min_x = 0 if max_x is not None else max(0, int(self.lam - 7 * self.lam**0.5))
+            if max_x is None:
+                max_x = int(self.lam + 7 * self.lam**0.5) + 2
+            to_plot = np.arange(min_x, max_x)
+            probs = self(to_plot)
+            axis.scatter(to_plot, probs)
+            axis.set_ylim([-0.025, min(1, probs.max() + 0.1)])
+            if show:
+                pyplot().show()
+            return axis
             
     class DiscreteUniform:
         '''
@@ -321,26 +914,44 @@ class DiscreteDistribution:
                      \nmean = {self.mean} and variance = {self.var}"
         
         def __call__(self, x: int) -> float:
-            if not(self.a <= x <= self.b):
+            x = np.asarray(x)
+            if not ((self.a <= x) & (x <= self.b)).all():
                 raise Exception(f"x must be a integer in [{self.a}, {self.b}]")
-            return np.round(self.p, 4)
+            return np.round(np.full(x.shape, self.p), 4)[()]
         
         def cdf(self, x: int) -> float:
-            if x < 0:
-                return 0
-            elif x >= self.b:
-                return 1
-            else:
-                return np.round((x - self.a + 1) / self.n , 4)
-        
-        def plot(self):
-            figure = plt.figure()
-            axis = figure.add_subplot()
-            to_plot = [i for i in range(self.a, self.b + 1)]
-            probs = [self(i) for i in to_plot]
-            plt.scatter(to_plot, probs)
+            x = np.floor(np.asarray(x, dtype=float))
+            F = np.clip((x - self.a + 1) / self.n, 0, 1)
+            return np.round(F, 4)[()]
+        
+        def rvs(self, size= None, rng= None) -> np.ndarray:
+            '''
+            Draws samples uniformly from the integers in [a, b].
+
+            Parameters
+            ----------
+            size : int or tuple, optional
+                Shape of the output. The default is None (a single sample).
+            rng : np.random.Generator or int, optional
+                Generator or seed. The default is None (fresh entropy).
+
+            Returns
+            -------
+            np.ndarray
+                Samples.
+
+            '''
+            rng = np.random.default_rng(rng)
+            return rng.integers(self.a, self.b + 1, size)
+        
+        def plot(self, axis= None):
+            axis, show = plotAxis(axis)
+            to_plot = np.arange(self.a, self.b + 1)
+            axis.scatter(to_plot, self(to_plot))
             axis.set_ylim([-0.005, 0.6])
-            plt.show()
+            if show:
+                pyplot().show()
+            return axis
             
 
 class ContinuousDistribution:
@@ -350,6 +961,7 @@ class ContinuousDistribution:
     Each one can be called returning the probability of assuming values in an interval,
     each one has the mean and variance (var) available.
     A cdf method is also available and calculate F(X <= x).
+    Samples are drawn with rvs.
     '''
     class Uniform:
         '''
@@ -371,26 +983,56 @@ class ContinuousDistribution:
                      \nmean = {self.mean} and variance = {self.var}"
         
         def __call__(self, x1: float, x2: float) -> float:
-            assert x1 <= x2, "Insert a valid interval"
+            assert np.all(np.asarray(x1) <= np.asarray(x2)), "Insert a valid interval"
             p = self.cdf(x2) - self.cdf(x1)
             return np.round(p, 4)
         
+        def pdf(self, x: float) -> float:
+            '''
+            Density, 1 / (b - a) inside [a, b] and 0 outside.
+            '''
+            x = np.asarray(x, dtype=float)
+            return np.where((self.a <= x) & (x <= self.b), self.p, 0.0)[()]
+        
         def cdf(self, x: float) -> float:
-            if x < 0:
-                return 0
-            elif x >= self.b:
-                return 1
-            else:
-                return np.round((x - self.a) / self.n , 4)
-        
-        def plot(self):
-            figure = plt.figure()
-            axis = figure.add_subplot()
-            to_plot = [self.a, self.b]
-            probs = [self.p] * 2
-            plt.plot(to_plot, probs)
+            x = np.asarray(x, dtype=float)
+            return np.clip((x - self.a) / self.n, 0, 1)[()]
+        
+        def ppf(self, p: float) -> float:
+            '''
+            Inverse of the cdf, a + p (b - a).
+            '''
+            p = np.asarray(p, dtype=float)
+            assert ((0 <= p) & (p <= 1)).all(), "Probabilities must be between 0 and 1"
+            return (self.a + p * self.n)[()]
+        
+        def rvs(self, size= None, rng= None) -> np.ndarray:
+            '''
+            Draws samples uniformly from [a, b).
+
+            Parameters
+            ----------
+            size : int or tuple, optional
+                Shape of the output. The default is None (a single sample).
+            rng : np.random.Generator or int, optional
+                Generator or seed. The default is None (fresh entropy).
+
+            Returns
+            -------
+            np.ndarray
+                Samples.
+
+            '''
+            rng = np.random.default_rng(rng)
+            return self.a + self.n * rng.random(size)
+        
+        def plot(self, axis= None):
+            axis, show = plotAxis(axis)
+            axis.plot([self.a, self.b], [self.p] * 2)
             axis.set_ylim([-0.005, 0.6])
-            plt.show()
+            if show:
+                pyplot().show()
+            return axis
     
     class Exponential:
         '''
@@ -409,29 +1051,71 @@ class ContinuousDistribution:
                      \nmean = {self.mean} and variance = {self.var}"
         
         def __call__(self, x1: float, x2: float) -> float:
-            assert x1 <= x2, "Insert a valid interval"
+            assert np.all(np.asarray(x1) <= np.asarray(x2)), "Insert a valid interval"
             p = self.cdf(x2) - self.cdf(x1)
             return np.round(p, 4)
         
         def call(self, x: float) -> float:
-            return self.lam * np.e**(-self.lam * x)
+            return self.pdf(x)
+        
+        def pdf(self, x: float) -> float:
+            '''
+            Density, lambda e^(-lambda x) for x >= 0.
+            '''
+            x = np.asarray(x, dtype=float)
+            return np.where(x >= 0, self.lam * np.exp(-self.lam * np.maximum(x, 0)), 0.0)[()]
         
         def cdf(self, x: float) -> float:
-            if x < 0:
-                return 0
-            else:
-                return np.round(1 - np.e**(-self.lam * x) , 4)
+            x = np.asarray(x, dtype=float)
+            return -np.expm1(-self.lam * np.maximum(x, 0))[()]
+        
+        def sf(self, x: float) -> float:
+            '''
+            Survival function, F(X > x) = e^(-lambda x).
+            '''
+            x = np.asarray(x, dtype=float)
+            return np.exp(-self.lam * np.maximum(x, 0))[()]
+        
+        def ppf(self, p: float) -> float:
+            '''
+            Inverse of the cdf, -log(1 - p) / lambda.
+            '''
+            p = np.asarray(p, dtype=float)
+            assert ((0 <= p) & (p <= 1)).all(), "Probabilities must be between 0 and 1"
+            with np.errstate(divide='ignore'):
+                return (-np.log1p(-p) / self.lam)[()]
+        
+        def rvs(self, size= None, rng= None) -> np.ndarray:
+            '''
+            Draws samples by inversion, -log(1 - U) / lambda.
+
+            Parameters
+            ----------
+            size : int or tuple, optional
+                Shape of the output. The default is None (a single sample).
+            rng : np.random.Generator or int, optional
+                Generator or seed. The default is None (fresh entropy).
+
+            Returns
+            -------
+            np.ndarray
+                Samples.
+
+            '''
+            rng = np.random.default_rng(rng)
+            return -np.log1p(-rng.random(size)) / self.lam
         
-        def plot(self, max_x: int= None):
+        def plot(self, max_x: int= None, axis= None):
+            axis, show = plotAxis(axis)
             if max_x == None:
                 max_x = (self.lam**-1) * 3
-            figure = plt.figure()
-            axis = figure.add_subplot()
-            to_plot = generate_range(0, max_x, 10**4)
-            probs = [self.call(i) for i in to_plot]
-            plt.plot(to_plot, probs)
-            axis.set_ylim([-0.0125, max(probs) + 0.075])
-            plt.show()
+            to_plot = densityGrid(self, 0, max_x)
+            probs = self.pdf(to_plot)
+            axis.plot(to_plot, probs)
+            axis.set_ylim([-0.0125, probs.max() + 0.075])
+            if show:
+                pyplot().show()
+            return axis
     
     class Normal:
         '''
@@ -450,26 +1134,349 @@ class ContinuousDistribution:
                      \nmean = {self.mean} and variance = {self.var}"
         
         def __call__(self, x1: float, x2: float) -> float:
-            assert x1 <= x2, "Insert a valid interval"
+            assert np.all(np.asarray(x1) <= np.asarray(x2)), "Insert a valid interval"
             p = self.cdf(x2) - self.cdf(x1)
             return np.round(p, 5)
         
         def call(self, x: float) -> float:
-            return (1 / (self.std * (2 * np.pi)**0.5)) * np.e**(-0.5 * (((x - self.mean) / self.std)**2))
+            return self.pdf(x)
+        
+        def pdf(self, x: float) -> float:
+            '''
+            Density, e^(-z^2 / 2) / (std sqrt(2 pi)), with z = (x - mean) / std.
+            '''
+            z = (np.asarray(x, dtype=float) - self.mean) / self.std
+            return (np.exp(-0.5 * z**2) / (self.std * np.sqrt(2 * np.pi)))[()]
         
         def cdf(self, x: float) -> float:
-            o = 1 / (self.std * np.sqrt(2 * np.pi))
-            z = lambda x: (x - self.mean) / self.std
-            f = lambda x: o * np.e**(-0.5*(z(x)**2))
-            return np.round(integral(f, self.mean - 7*self.std, x),  5)
+            '''
+            F(X <= x) = erfc(-z / sqrt(2)) / 2, with z = (x - mean) / std.
+            '''
+            z = (np.asarray(x, dtype=float) - self.mean) / self.std
+            return 0.5 * erfc(-z / np.sqrt(2))
+        
+        def sf(self, x: float) -> float:
+            '''
+            Survival function, F(X > x) = erfc(z / sqrt(2)) / 2.
+            
+            Computed directly instead of 1 - cdf(x) so the upper tail keeps full precision.
+            '''
+            z = (np.asarray(x, dtype=float) - self.mean) / self.std
+            return 0.5 * erfc(z / np.sqrt(2))
         
-        def plot(self):
+        def ppf(self, p: float) -> float:
+            '''
+            Inverse of the cdf (quantile function).
+            
+            Acklam's rational approximation followed by one Halley step on the
+            erfc based cdf, which brings it to machine precision.
+
+            Parameters
+            ----------
+            p : float
+                Probabilities in [0, 1], scalar or array.
+
+            Returns
+            -------
+            float
+                x such that F(X <= x) = p.
+
+            '''
+            p = np.asarray(p, dtype=float)
+            assert ((0 <= p) & (p <= 1)).all(), "Probabilities must be between 0 and 1"
+            return (self.mean + self.std * _standardNormalPpf(p))[()]
+        
+        def rvs(self, size= None, rng= None) -> np.ndarray:
+            '''
+            Draws samples with numpy's ziggurat standard normal generator.
+
+            Parameters
+            ----------
+            size : int or tuple, optional
+                Shape of the output. The default is None (a single sample).
+            rng : np.random.Generator or int, optional
+                Generator or seed. The default is None (fresh entropy).
+
+            Returns
+            -------
+            np.ndarray
+                Samples.
+
+            '''
+            rng = np.random.default_rng(rng)
+            return self.mean + self.std * rng.standard_normal(size)
+        
+        def plot(self, axis= None):
+            axis, show = plotAxis(axis)
             max_range = self.mean + (self.std * 7)
             min_range = self.mean - (self.std * 7)
-            figure = plt.figure()
-            axis = figure.add_subplot()
-            to_plot = generate_range(min_range, max_range, 10**4)
-            probs = [self.call(i) for i in to_plot]
-            plt.plot(to_plot, probs)
-            axis.set_ylim([-0.0125, max(probs) + 0.075])
-            plt.show()
\ No newline at end of file
+            to_plot = densityGrid(self, min_range, max_range)
+            probs = self.pdf(to_plot)
+            axis.plot(to_plot, probs)
+            axis.set_ylim([-0.0125, probs.max() + 0.075])
+            if show:
+                pyplot().show()
+            return axis
+
+    class StudentT:
+        '''
+        Student's t Distribution
+        
+        Distribution of the standardized mean of a normal sample with unknown
+        variance, df is the number of degrees of freedom. Every method also
+        accepts an array of df (one distribution per element).
+        '''
+        def __init__(self, df: float):
+            assert np.all(np.asarray(df) > 0), "The degrees of freedom must be positive"
+            self.df = df
+            df = np.asarray(df, dtype=float)
+            self.mean = np.where(df > 1, 0.0, np.nan)[()]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                self.var = np.where(df > 2, df / (df - 2), np.where(df > 1, np.inf, np.nan))[()]
+            
+        def __repr__(self):
+            return f"Student's t with {self.df} degrees of freedom \
+                     \nmean = {self.mean} and variance = {self.var}"
+        
+        def __call__(self, x1: float, x2: float) -> float:
+            assert np.all(np.asarray(x1) <= np.asarray(x2)), "Insert a valid interval"
+            p = self.cdf(x2) - self.cdf(x1)
+            return np.round(p, 5)
+        
+        def pdf(self, x: float) -> float:
+            '''
+            Density, Gamma((df + 1) / 2) / (Gamma(df / 2) sqrt(df pi)) (1 + x^2 / df)^(-(df + 1) / 2).
+            '''
+            return np.exp(self.logpdf(x))
+        
+        def logpdf(self, x: float) -> float:
+            '''
+            Natural logarithm of the density.
+            
+            The ratio of gamma functions is written through stirlerr, so it
+            keeps its precision for df in the millions.
+            '''
+            x = np.asarray(x, dtype=float)
+            h = np.asarray(self.df, dtype=float) / 2
+            z = np.abs(x) / np.sqrt(2 * h)
+            with np.errstate(divide='ignore'):
+                log1p_z2 = np.where(z > 1, 2 * np.log(z) + np.log1p(1 / np.maximum(z, 1)**2), np.log1p(np.minimum(z, 1)**2))
+            return (-0.5 * np.log(2 * np.pi) + h * np.log1p(0.5 / h) - 0.5 + stirlerr(h + 0.5) - stirlerr(h)
+                    - (h + 0.5) * log1p_z2)[()]
+        
+        def cdf(self, x: float) -> float:
+            '''
+            F(X <= x) = sf(-x), by symmetry.
+            '''
+            return self.sf(-np.asarray(x, dtype=float))
+        
+        def sf(self, x: float) -> float:
+            '''
+            Survival function, F(X > x) = I_(df / (df + x^2))(df / 2, 1 / 2) / 2 for x >= 0
+            (the regularized incomplete beta function) and 1 - sf(-x) for x < 0.
+            '''
+            x = np.asarray(x, dtype=float)
+            x, df = np.broadcast_arrays(x, np.asarray(self.df, dtype=float))
+            # Near 0 the complement keeps the precision, 1 - I_(z^2 / (1 + z^2))(1 / 2, df / 2) with z^2 = x^2 / df
+            near = x * x < 3
+            z2 = x[near]**2 / df[near]
+            tail = np.empty(x.shape)
+            tail[near] = 0.5 - 0.5 * betainc(0.5, df[near] / 2, z2 / (1 + z2))
+            r2 = (np.sqrt(df[~near]) / np.abs(x[~near]))**2
+            tail[~near] = 0.5 * betainc(df[~near] / 2, 0.5, r2 / (1 + r2))
+            return np.where(x >= 0, tail, 1 - tail)[()]
+        
+        def ppf(self, p: float) -> float:
+            '''
+            Inverse of the cdf (quantile function).
+            
+            Hill's approximation (Algorithm 396) followed by Newton steps on
+            log sf(t) against log t, which is nearly linear in the tails.
+            Exact formulas for 1 and 2 degrees of freedom.
+
+            Parameters
+            ----------
+            p : float
+                Probabilities in [0, 1], scalar or array.
+
+            Returns
+            -------
+            float
+                x such that F(X <= x) = p.
+
+            '''
+            p = np.asarray(p, dtype=float)
+            assert ((0 <= p) & (p <= 1)).all(), "Probabilities must be between 0 and 1"
+            p, df = np.broadcast_arrays(p, np.asarray(self.df, dtype=float))
+            shape = p.shape
+            # Flat copies, so the refined elements can be indexed even for scalars
+            p, df = np.atleast_1d(p).ravel(), np.atleast_1d(df).ravel()
+            # Upper tail probability of |t|, the sign is restored at the end
+            q = np.minimum(p, 1 - p)
+            t = _studentTIsf(q, df)
+            refine = (q > 0) & (q < 0.5) & (df != 1) & (df != 2)
+            active = np.flatnonzero(refine)
+            with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+                for _ in range(50):
+                    dist = ContinuousDistribution.StudentT(df[active])
+                    tr = t[active]
+                    log_sf = np.log(dist.sf(tr))
+                    slope = np.exp(dist.logpdf(tr) + np.log(tr) - log_sf)
+                    step = tr * np.exp((log_sf - np.log(q[active])) / slope)
+                    step = np.where(np.isfinite(step) & (step > 0), step, tr)
+                    t[active] = step
+                    active = active[np.abs(step - tr) > 1e-12 * step]
+                    if active.size == 0:
+                        break
+            return np.where(p < 0.5, -t, t).reshape(shape)[()]
+        
+        def rvs(self, size= None, rng= None) -> np.ndarray:
+            '''
+            Draws samples with numpy's Student's t generator.
+
+            Parameters
+            ----------
+            size : int or tuple, optional
+                Shape of the output. The default is None (a single sample).
+            rng : np.random.Generator or int, optional
+                Generator or seed. The default is None (fresh entropy).
+
+            Returns
+            -------
+            np.ndarray
+                Samples.
+
+            '''
+            rng = np.random.default_rng(rng)
+            return rng.standard_t(self.df, size)
+        
+        def plot(self, axis= None):
+            axis, show = plotAxis(axis)
+            max_range = self.ppf(0.995)
+            to_plot = densityGrid(self, -max_range, max_range)
+            probs = self.pdf(to_plot)
+            axis.plot(to_plot, probs)
+            axis.set_ylim([-0.0125, probs.max() + 0.075])
+            if show:
+                pyplot().show()
+            return axis
+
+def densityGrid(dist, a: float, b: float, n: int= 1000) -> np.ndarray:
+    '''
+    Grid for plotting the density of a continuous distribution on [a, b].
+    
+    Half of the points are evenly spaced and half are placed at evenly spaced
+    probabilities (through the ppf), which packs them where the density peaks.
+
+    Parameters
+    ----------
+    dist : distribution
+        Continuous distribution with vectorized cdf and ppf.
+    a : float
+        Lower value.
+    b : float
+        Upper value.
+    n : int, optional
+        Points of each half. The default is 1000.
+
+    Returns
+    -------
+    np.ndarray
+        Sorted, distinct points of [a, b].
+
+    '''
+    quantiles = dist.ppf(np.linspace(dist.cdf(a), dist.cdf(b), n))
+    return np.unique(np.clip(np.concatenate([np.linspace(a, b, n), quantiles]), a, b))
+
+# Coefficients of Acklam's approximation to the standard normal quantile function
+_PPF_A = (-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02,
+          1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00)
+_PPF_B = (-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02,
+          6.680131188771972e+01, -1.328068155288572e+01)
+_PPF_C = (-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00,
+          -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00)
+_PPF_D = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00,
+          3.754408661907416e+00)
+
+def _standardNormalPpf(p: np.ndarray) -> np.ndarray:
+    '''
+    Quantile function of N(0, 1), vectorized over p.
+
+    The lower half is computed directly and the upper half by symmetry,
+    so both tails keep their relative precision.
+
+    Parameters
+    ----------
+    p : np.ndarray
+        Probabilities in [0, 1].
+
+    Returns
+    -------
+    np.ndarray
+        Standard normal quantiles.
+
+    '''
+    q = np.minimum(p, 1 - p)
+    x = np.empty(q.shape)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tail = q < 0.02425
+        r = np.sqrt(-2 * np.log(q[tail]))
+        num = ((((_PPF_C[0]*r + _PPF_C[1])*r + _PPF_C[2])*r + _PPF_C[3])*r + _PPF_C[4])*r + _PPF_C[5]
+        den = (((_PPF_D[0]*r + _PPF_D[1])*r + _PPF_D[2])*r + _PPF_D[3])*r + 1
+        x[tail] = num / den
+        
+        r = q[~tail] - 0.5
+        t = r * r
+        num = (((((_PPF_A[0]*t + _PPF_A[1])*t + _PPF_A[2])*t + _PPF_A[3])*t + _PPF_A[4])*t + _PPF_A[5]) * r
+        den = ((((_PPF_B[0]*t + _PPF_B[1])*t + _PPF_B[2])*t + _PPF_B[3])*t + _PPF_B[4])*t + 1
+        x[~tail] = num / den
+        
+        x[q == 0] = -np.inf
+        
+        # Halley refinement, e is the error of the current estimate in probability space
+        finite = np.isfinite(x)
+        xf = x[finite]
+        e = 0.5 * erfc(-xf / np.sqrt(2)) - q[finite]
+        u = e * np.sqrt(2 * np.pi) * np.exp(0.5 * xf * xf)
+        x[finite] = xf - u / (1 + 0.5 * xf * u)
+    
+    return np.where(p > 0.5, -x, x)
+
+def _studentTIsf(q: np.ndarray, df: np.ndarray) -> np.ndarray:
+    '''
+    t >= 0 with upper tail probability q (q <= 1/2) for df degrees of freedom.
+    
+    Exact for df = 1 and 2, Hill's approximation (Algorithm 396, accurate to
+    a few digits) for df > 1 and the power law of the tail for df < 1.
+    '''
+    P = 2 * q
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        t = np.sqrt(df * _hillY(P, df))
+        # sf(t) ~ df^((df - 1) / 2) t^-df / (sqrt(df) B(df / 2, 1 / 2)) for large t
+        log_beta = lgamma(df / 2) + lgamma(0.5) - lgamma(df / 2 + 0.5)
+        tail = np.exp(((df / 2 - 1) * np.log(df) - log_beta - np.log(q)) / df)
+        t = np.where(df < 1, tail, t)
+        t = np.where(df == 2, np.sqrt(2 / (P * (2 - P)) - 2), t)
+        t = np.where(df == 1, 1 / np.tan(P * np.pi / 2), t)
+    return np.where(q == 0, np.inf, np.where(q == 0.5, 0.0, t))
+
+def _hillY(P: np.ndarray, n: np.ndarray) -> np.ndarray:
+    '''
+    t^2 / n for the two sided probability P in Hill's algorithm.
+    '''
+    a = 1 / (n - 0.5)
+    b = 48 / (a * a)
+    c = ((20700 * a / b - 98) * a - 16) * a + 96.36
+    d = ((94.5 / (b + c) - 3) / b + 1) * np.sqrt(a * np.pi / 2) * n
+    log_y = 2 / n * np.log(d * P)
+    y = np.exp(log_y)
+    # Far in the tail (small P) the series in y, otherwise a normal based expansion
+    x = _standardNormalPpf(P / 2)
+    c = np.where(n < 5, c + 0.3 * (n - 4.5) * (x + 0.6), c)
+    c = (((0.05 * d * x - 5) * x - 7) * x - 2) * x + b + c
+    z = (((((0.4 * x * x + 6.3) * x * x + 36) * x * x + 94.5) / c - x * x - 3) / b + 1) * x
+    normal = np.expm1(a * z * z)
+    tail = ((1 / (((n + 6) / (n * y) - 0.089 * d - 0.822) * (n + 2) * 3) + 0.5 / (n + 4)) * y - 1) * (n + 1) / (n + 2) + 1 / y
+    # When y underflows only the leading 1 / y term matters
+    tail = np.where(log_y < -700, np.exp(-log_y), tail)
+    return np.where(y > 0.05 + a, normal, tail)
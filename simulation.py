@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+Monte Carlo estimation of probabilities and distribution quantities.
+
+Samples are drawn in batches from independent streams spawned from a single
+seed (np.random.SeedSequence), optionally over a pool of processes, and the
+partial results are merged with statistics.Moments. Sampling stops once the
+confidence interval of the estimate is narrow enough.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from probability import Event, PredicateEvent
+from statistics import Moments, confidenceIntMeanZ
+
+def monteCarlo(sampler, width: float= None, CL: float= 0.95, batch_size: int= 10**5,
+               max_samples: int= 10**7, workers: int= 1, seed: int= None) -> tuple:
+    '''
+    Estimates the mean of the values produced by sampler.
+
+    Each round draws one batch per worker, every batch with its own stream
+    (the i-th batch always uses the i-th stream spawned from seed, so the
+    result is reproducible for a given seed and number of workers).
+
+    Parameters
+    ----------
+    sampler : function
+        sampler(rng, size) returns an array of size values. With workers > 1
+        it must be picklable (a module level function or class instance).
+    width : float, optional
+        Stop when the confidence interval is narrower than this.
+        The default is None (draw max_samples values).
+    CL : float, optional
+        Confidence level of the interval. The default is 0.95.
+    batch_size : int, optional
+        Values drawn per batch. The default is 10**5.
+    max_samples : int, optional
+        Maximum number of values. The default is 10**7.
+    workers : int, optional
+        Number of processes. The default is 1 (no pool).
+    seed : int, optional
+        Seed of the streams. The default is None (fresh entropy).
+
+    Returns
+    -------
+    tuple
+        Estimate, margin of error and number of values drawn.
+
+    '''
+    streams = np.random.SeedSequence(seed)
+    moments = Moments()
+    # The sampler is sent once to each process, the tasks only carry a stream and a size
+    executor = ProcessPoolExecutor(workers, initializer=_initSampler, initargs=(sampler,)) if workers > 1 else None
+    try:
+        while moments.n < max_samples:
+            sizes = [min(batch_size, max_samples - moments.n - i * batch_size) for i in range(workers)]
+            tasks = [(stream, size) for stream, size in zip(streams.spawn(workers), sizes) if size > 0]
+            results = executor.map(_runBatch, tasks) if executor else (_batch(sampler, *task) for task in tasks)
+            for partial in results:
+                moments.merge(partial)
+            margin = _margin(moments, CL)
+            if width is not None and 2 * margin <= width:
+                break
+    finally:
+        if executor:
+            executor.shutdown()
+    return moments.mean, _margin(moments, CL), moments.n
+
+def estimateProb(event, **kwargs) -> tuple:
+    '''
+    Estimates P(E) by drawing outcomes uniformly from the sample space of E.
+
+    Parameters
+    ----------
+    event : Event or PredicateEvent
+
+    **kwargs
+        Options of monteCarlo.
+
+    Returns
+    -------
+    tuple
+        Estimate, margin of error and number of outcomes drawn.
+
+    '''
+    return monteCarlo(_EventSampler(event), **kwargs)
+
+def estimateCdf(dist, x: float, **kwargs) -> tuple:
+    '''
+    Estimates F(X <= x) from samples of dist (any distribution with rvs).
+    '''
+    return monteCarlo(_DistributionSampler(dist, 'cdf', x), **kwargs)
+
+def estimateSf(dist, x: float, **kwargs) -> tuple:
+    '''
+    Estimates the tail probability F(X > x) from samples of dist.
+    '''
+    return monteCarlo(_DistributionSampler(dist, 'sf', x), **kwargs)
+
+def estimateMoment(dist, k: int= 1, **kwargs) -> tuple:
+    '''
+    Estimates E[X^k] from samples of dist.
+    '''
+    return monteCarlo(_DistributionSampler(dist, 'moment', k), **kwargs)
+
+def _batch(sampler, stream: np.random.SeedSequence, size: int) -> Moments:
+    '''
+    Draws one batch of values and summarizes it.
+    '''
+    return Moments(sampler(np.random.default_rng(stream), size))
+
+_SAMPLER = None
+
+def _initSampler(sampler):
+    global _SAMPLER
+    _SAMPLER = sampler
+
+def _runBatch(task: tuple) -> Moments:
+    return _batch(_SAMPLER, *task)
+
+def _margin(moments: Moments, CL: float) -> float:
+    '''
+    Margin of error of the mean accumulated in moments.
+    
+    When every value is 0 or every value is 1 (an event never or always seen)
+    the normal interval has no width, so the margin is floored by the rule of
+    three, -log(1 - CL) / n (3 / n at 95%).
+    '''
+    if moments.n < 2:
+        return np.inf
+    margin = confidenceIntMeanZ(moments.mean, moments.n, moments.std, CL)[0]
+    if moments.mean == 0 or moments.mean == 1:
+        margin = max(margin, -np.log1p(-CL) / moments.n)
+    return margin
+
+class _EventSampler:
+    '''
+    Indicator of an event on outcomes drawn uniformly from its sample space.
+    '''
+    def __init__(self, event):
+        self.event = event
+
+    def __call__(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        if isinstance(self.event, Event):
+            idxs = rng.integers(self.event.sample_space.cardinality, size=size)
+            return (self.event.mask[idxs >> 6] >> (idxs & 63).astype(np.uint64)) & np.uint64(1)
+        if isinstance(self.event, PredicateEvent):
+            outcomes = self.event.sample_space.sample(size, rng)
+            return np.fromiter(map(self.event.predicate, outcomes), float, size)
+        raise Exception("The event must be an Event or a PredicateEvent")
+
+class _DistributionSampler:
+    '''
+    Function of samples drawn with the rvs method of a distribution.
+    '''
+    def __init__(self, dist, kind: str, value):
+        self.dist = dist
+        self.kind = kind
+        self.value = value
+
+    def __call__(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        X = self.dist.rvs(size, rng)
+        if self.kind == 'cdf':
+            return X <= self.value
+        if self.kind == 'sf':
+            return X > self.value
+        return np.asarray(X, dtype=float)**self.value
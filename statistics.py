@@ -1,7 +1,11 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
-from data import DataCsv
+from data import Dataset
+from probability import ContinuousDistribution
+from utils import pyplot, plotAxis
 import numpy as np
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+_NORMAL = ContinuousDistribution.Normal()
 
 def mean(X: list) -> float:
     '''
@@ -18,7 +22,8 @@ def mean(X: list) -> float:
         Mean of X.
 
     '''
-    return np.round(sum(X) / len(X), 4)
+    X = np.asarray(X)
+    return np.round(X.sum() / X.size, 4)
 
 def mode(X: list) -> float:
     '''
@@ -34,7 +39,53 @@ def mode(X: list) -> float:
     Mode of X.
 
     '''
-    return max(set(X), key=list(X).count)
+    return modes(X)[0]
+
+def modes(X: list) -> list:
+    '''
+    Computes every mode of a list (all the values tied at the highest frequency).
+
+    Parameters
+    ----------
+    X : list
+        
+
+    Returns
+    -------
+    list
+        Modes of X, in the order returned by frequencyTable.
+
+    '''
+    values, counts = frequencyTable(X)
+    return [values[i] for i in np.flatnonzero(counts == counts.max())]
+
+def frequencyTable(X: list) -> tuple:
+    '''
+    Counts the occurrences of each distinct value of X in a single pass.
+    
+    Integer and boolean arrays with a small range are counted with np.bincount,
+    anything else with a hash table (collections.Counter).
+
+    Parameters
+    ----------
+    X : list
+        
+
+    Returns
+    -------
+    tuple
+        List of distinct values and array with their frequencies.
+
+    '''
+    X = np.asarray(X).ravel()
+    if X.dtype.kind in 'biu' and X.size:
+        low = int(X.min())
+        if int(X.max()) - low <= 4 * X.size:
+            counts = np.bincount(X.astype(np.int64) - low)
+            values = np.flatnonzero(counts)
+            return (values + low).astype(X.dtype).tolist(), counts[values]
+    counter = Counter(X.tolist())
+    return list(counter.keys()), np.fromiter(counter.values(), np.int64, len(counter))
 
 def modeWithFrequency(X: list, f: list) :
     '''
@@ -52,7 +103,119 @@ def modeWithFrequency(X: list, f: list) :
     Mode of X.
 
     '''
-    return X[f.index(max(f))]
+    return X[int(np.argmax(f))]
+
+class HeavyHitters:
+    '''
+    Bounded memory summary of the most frequent values of a stream (Misra-Gries).
+    
+    Keeps at most k counters. Every counter underestimates the true frequency
+    of its value by at most error <= n / (k + 1), and any value more frequent
+    than that is guaranteed to have a counter. Summaries of different chunks
+    (or workers) can be merged with the same guarantee.
+    '''
+    def __init__(self, k: int):
+        '''
+        
+
+        Parameters
+        ----------
+        k : int
+            Maximum number of counters.
+
+        Returns
+        -------
+        None.
+
+        '''
+        assert k > 0, "k must be positive"
+        self.k = k
+        self.n = 0
+        self.error = 0
+        self.counters = {}
+    
+    def __repr__(self):
+        return f"HeavyHitters with {len(self.counters)} of {self.k} counters over {self.n} values"
+    
+    def update(self, X: list, f: list= None):
+        '''
+        Adds a chunk of values, or of pre-aggregated values with their frequencies
+        (the same inputs as modeWithFrequency).
+
+        Parameters
+        ----------
+        X : list
+            Values.
+        f : list, optional
+            Frequencies of the values. The default is None (each value counts once).
+
+        Returns
+        -------
+        HeavyHitters
+            The summary itself.
+
+        '''
+        if f is None:
+            X, f = frequencyTable(X)
+        f = np.asarray(f, dtype=np.int64).tolist()
+        other = HeavyHitters(self.k)
+        # Repeated values add up their frequencies
+        other.counters = Counter()
+        for x, count in zip(X, f):
+            other.counters[x] += count
+        other.n = sum(f)
+        return self.merge(other)
+    
+    def merge(self, other):
+        '''
+        Merges another summary into this one.
+
+        Parameters
+        ----------
+        other : HeavyHitters
+            
+
+        Returns
+        -------
+        HeavyHitters
+            The summary itself.
+
+        '''
+        counters = Counter(self.counters)
+        counters.update(other.counters)
+        self.n += other.n
+        self.error += other.error
+        if len(counters) > self.k:
+            # Subtracting the (k + 1)-th largest count from every counter leaves at most k positive ones
+            threshold = sorted(counters.values(), reverse=True)[self.k]
+            counters = {key: c - threshold for key, c in counters.items() if c > threshold}
+            self.error += threshold
+        self.counters = dict(counters)
+        return self
+    
+    def top(self, m: int= None) -> tuple:
+        '''
+        Most frequent values, by decreasing (estimated) frequency.
+
+        Parameters
+        ----------
+        m : int, optional
+            Number of values. The default is None (every counter).
+
+        Returns
+        -------
+        tuple
+            List of values and array with their estimated frequencies.
+
+        '''
+        items = sorted(self.counters.items(), key=lambda item: -item[1])[:m]
+        return [i[0] for i in items], np.array([i[1] for i in items], dtype=np.int64)
+    
+    def mode(self):
+        '''
+        Mode of the stream (exact whenever its frequency is above error).
+        '''
+        return modeWithFrequency(*self.top())
 
 def median(X: list) -> float:
     '''
@@ -69,11 +232,70 @@ def median(X: list) -> float:
         Median of X.
 
     '''
-    X_sorted = sorted(X)
-    n = len(X)
-    if n % 2 != 0:
-        return X_sorted[(n - 1) // 2]
-    return (X_sorted[(n - 1) // 2] + X_sorted[((n - 1) // 2) + 1]) / 2
+    return quantile(X, 0.5, 'midpoint')
+
+def quantile(X: list, qs, method: str= 'linear'):
+    '''
+    Computes one or many quantiles of X.
+    
+    Uses selection (np.partition, introselect) on the positions needed by all
+    the requested quantiles at once instead of sorting X.
+    For the quantile q the position is h = (n - 1) q, between X[i] and X[j]
+    (the sorted values at floor(h) and ceil(h)) the methods give:
+     - linear : X[i] + (X[j] - X[i]) * (h - i)
+     - lower : X[i]
+     - higher : X[j]
+     - nearest : the closest of X[i] and X[j] (even index on ties)
+     - midpoint : (X[i] + X[j]) / 2
+    
+    As with np.quantile, every quantile is nan when X contains nan.
+
+    Parameters
+    ----------
+    X : list
+        
+    qs : float or list
+        Quantiles, in [0, 1].
+    method : str, optional
+        Interpolation method. The default is 'linear'.
+
+    Raises
+    ------
+    Exception
+        When method is unknown.
+
+    Returns
+    -------
+    float or np.ndarray
+        Quantiles of X, with the shape of qs.
+
+    '''
+    X = np.asarray(X).ravel()
+    qs = np.asarray(qs, dtype=float)
+    assert X.size > 0, "X must not be empty"
+    assert ((0 <= qs) & (qs <= 1)).all(), "Quantiles must be between 0 and 1"
+    h = (X.size - 1) * qs
+    i = np.floor(h).astype(np.int64)
+    j = np.ceil(h).astype(np.int64)
+    if X.dtype.kind == 'f' and np.isnan(X).any():
+        # np.partition moves nan to the end, which would shift every position
+        X = np.full(X.size, np.nan)
+    else:
+        X = np.partition(X, np.unique(np.concatenate([i.ravel(), j.ravel()])))
+    low, high, frac = X[i], X[j], h - i
+    if method == 'linear':
+        Q = low + (high - low) * frac
+    elif method == 'lower':
+        Q = low
+    elif method == 'higher':
+        Q = high
+    elif method == 'nearest':
+        Q = np.where((frac > 0.5) | ((frac == 0.5) & (j % 2 == 0)), high, low)
+    elif method == 'midpoint':
+        Q = np.where(i == j, low, (low + high) / 2)
+    else:
+        raise Exception("Use one of the following methods: linear, lower, higher, nearest, midpoint")
+    return np.asarray(Q)[()]
 
 def variance(X: list) -> float:
     '''
@@ -89,7 +311,7 @@ def variance(X: list) -> float:
         Variance of X.
 
     '''
-    return np.round(sum([(x - mean(X))**2 for x in X]) / (len(X) - 1), 4)
+    return np.round(Moments(X).variance, 4)
 
 def std(X: list) -> float:
     '''
@@ -106,7 +328,7 @@ def std(X: list) -> float:
         Standard deviation of X.
 
     '''
-    return np.round(variance(X)**0.5, 4)
+    return np.round(Moments(X).std, 4)
 
 def cov(X: list, Y: list) -> float:
     '''
@@ -125,8 +347,7 @@ def cov(X: list, Y: list) -> float:
         Covariance of X and Y.
 
     '''
-    mx, my = mean(X), mean(Y)
-    return np.round(sum([(i - mx) * (j - my) for i, j in zip(X, Y)]) / (len(X) - 1), 4)
+    return np.round(CoMoments(X, Y).cov, 4)
 
 def corr(X: list, Y: list) -> float:
     '''
@@ -145,39 +366,253 @@ def corr(X: list, Y: list) -> float:
         Correlation of X and Y.
 
     '''
-    stdx, stdy = std(X), std(Y)
-    covxy = cov(X, Y)
-    return np.round(covxy / (stdx * stdy), 4)
+    return np.round(CoMoments(X, Y).corr, 4)
+
+class Moments:
+    '''
+    Streaming accumulator for the count, mean and variance of a variable.
+    
+    Values can be added one at a time (Welford's update) or in batches, and
+    accumulators built on different parts of the data can be merged (Chan et al.),
+    so the result does not depend on how the data was split.
+    '''
+    def __init__(self, X: list= None):
+        '''
+        
+
+        Parameters
+        ----------
+        X : list, optional
+            Initial values.
+
+        Returns
+        -------
+        None.
+
+        '''
+        self.n = 0
+        self.mean = 0.0
+        self.M2 = 0.0
+        if X is not None:
+            self.update(X)
+    
+    def __repr__(self):
+        return f"Moments with {self.n} values \nmean = {self.mean} and variance = {self.variance}"
+    
+    def __add__(self, other):
+        return Moments().merge(self).merge(other)
+    
+    @property
+    def variance(self) -> float:
+        '''
+        Sample variance (nan for less than two values).
+        '''
+        return self.M2 / (self.n - 1) if self.n > 1 else np.nan
+    
+    @property
+    def std(self) -> float:
+        '''
+        Sample standard deviation.
+        '''
+        return self.variance**0.5
+    
+    def update(self, X):
+        '''
+        Adds a value or a batch of values.
+
+        Parameters
+        ----------
+        X : float or list
+            
+
+        Returns
+        -------
+        Moments
+            The accumulator itself.
+
+        '''
+        X = np.asarray(X, dtype=float).ravel()
+        if X.size == 1:
+            self.n += 1
+            delta = X[0] - self.mean
+            self.mean += delta / self.n
+            self.M2 += delta * (X[0] - self.mean)
+        elif X.size > 1:
+            batch = Moments()
+            batch.n = X.size
+            batch.mean = X.mean()
+            batch.M2 = ((X - batch.mean)**2).sum()
+            self.merge(batch)
+        return self
+    
+    def merge(self, other):
+        '''
+        Merges another accumulator into this one.
+
+        Parameters
+        ----------
+        other : Moments
+            
+
+        Returns
+        -------
+        Moments
+            The accumulator itself.
+
+        '''
+        if other.n == 0:
+            return self
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self.M2 += other.M2 + delta**2 * self.n * other.n / n
+        self.n = n
+        return self
+
+class CoMoments:
+    '''
+    Streaming accumulator for the count, means, variances, covariance and
+    correlation of a pair of variables.
+    
+    Same update and merge rules as Moments, extended to the co-moment.
+    '''
+    def __init__(self, X: list= None, Y: list= None):
+        '''
+        
+
+        Parameters
+        ----------
+        X : list, optional
+            Initial values of the first variable.
+        Y : list, optional
+            Initial values of the second variable.
+
+        Returns
+        -------
+        None.
+
+        '''
+        self.x = Moments()
+        self.y = Moments()
+        self.C = 0.0
+        if X is not None:
+            self.update(X, Y)
+    
+    def __repr__(self):
+        return f"CoMoments with {self.n} pairs \ncovariance = {self.cov} and correlation = {self.corr}"
+    
+    def __add__(self, other):
+        return CoMoments().merge(self).merge(other)
+    
+    @property
+    def n(self) -> int:
+        return self.x.n
+    
+    @property
+    def cov(self) -> float:
+        '''
+        Sample covariance (nan for less than two pairs).
+        '''
+        return self.C / (self.n - 1) if self.n > 1 else np.nan
+    
+    @property
+    def corr(self) -> float:
+        '''
+        Pearson correlation.
+        '''
+        return self.C / np.sqrt(self.x.M2 * self.y.M2)
+    
+    def update(self, X, Y):
+        '''
+        Adds a pair of values or a batch of pairs.
+
+        Parameters
+        ----------
+        X : float or list
+            
+        Y : float or list
+            
+
+        Returns
+        -------
+        CoMoments
+            The accumulator itself.
+
+        '''
+        X, Y = np.asarray(X, dtype=float).ravel(), np.asarray(Y, dtype=float).ravel()
+        assert X.size == Y.size, "X and Y must have the same length"
+        if X.size == 1:
+            dx = X[0] - self.x.mean
+            self.x.update(X)
+            self.y.update(Y)
+            self.C += dx * (Y[0] - self.y.mean)
+        elif X.size > 1:
+            batch = CoMoments()
+            batch.x.update(X)
+            batch.y.update(Y)
+            batch.C = ((X - batch.x.mean) * (Y - batch.y.mean)).sum()
+            self.merge(batch)
+        return self
+    
+    def merge(self, other):
+        '''
+        Merges another accumulator into this one.
 
-def plotHistogram(X: DataCsv, name: str):
+        Parameters
+        ----------
+        other : CoMoments
+            
+
+        Returns
+        -------
+        CoMoments
+            The accumulator itself.
+
+        '''
+        if other.n == 0:
+            return self
+        n = self.n + other.n
+        dx, dy = other.x.mean - self.x.mean, other.y.mean - self.y.mean
+        self.C += other.C + dx * dy * self.n * other.n / n
+        self.x.merge(other.x)
+        self.y.merge(other.y)
+        return self
+
+def plotHistogram(X: Dataset, name: str, axis= None):
     '''
-    Plots histogram of column "name"
+    Plots histogram of column "name", leaving out missing values (nan).
 
     Parameters
     ----------
-    X : DataCsv
+    X : Dataset
         The dataset.
     name : str
         The column.
+    axis : matplotlib.axes.Axes, optional
+        Axis to draw on. The default is None (a new figure).
 
     Returns
     -------
-    None.
+    matplotlib.axes.Axes
+        The axis.
 
     '''
-    data = X[name]
-    sorted(data)
-    x1 = data[:len(data) // 2]
-    x2 = data[len(data) // 2:]
-    IQR = (median(x2) - median(x1))
+    axis, show = plotAxis(axis)
+    data = np.asarray(X[name])
+    if data.dtype.kind == 'f':
+        data = data[~np.isnan(data)]
+    q1, q3 = quantile(data, [0.25, 0.75])
+    IQR = q3 - q1
     h = 2 * IQR / (len(data)**(1 / 3))
-    n = (max(data) - min(data)) // h
-    figure, axis = plt.subplots()
+    # Freedman-Diaconis bins, a single bin when the IQR is 0
+    n = max(1, int((data.max() - data.min()) // h)) if h > 0 else 1
     axis.set_title(name)
-    plt.hist(data, bins = int(n))
-    plt.show()
+    axis.hist(data, bins = n)
+    if show:
+        pyplot().show()
+    return axis
     
-def plotScatter(X: list, Y: list, title: str= None, labels: list= None):
+def plotScatter(X: list, Y: list, title: str= None, labels: list= None, axis= None):
     '''
     Plots scatterplot of X and Y.
 
@@ -191,22 +626,27 @@ def plotScatter(X: list, Y: list, title: str= None, labels: list= None):
         Title for the plot. The default is None.
     labels : list, optional
         Labels for the x and y axis. The default is None.
+    axis : matplotlib.axes.Axes, optional
+        Axis to draw on. The default is None (a new figure).
 
     Returns
     -------
-    None.
+    matplotlib.axes.Axes
+        The axis.
 
     '''
+    axis, show = plotAxis(axis)
     if title:
-        figure, axis = plt.subplots()
         axis.set_title(title)
     if labels:
         axis.set_xlabel(labels[0])
         axis.set_ylabel(labels[1])
-    plt.scatter(X, Y)
-    plt.show()
+    axis.scatter(X, Y)
+    if show:
+        pyplot().show()
+    return axis
 
-def plotBox(X: list, title: str= None):
+def plotBox(X: list, title: str= None, axis= None):
     '''
     Plots box plot of X.
 
@@ -216,19 +656,24 @@ def plotBox(X: list, title: str= None):
         
     title : str, optional
         Title for the plot. The default is None.
+    axis : matplotlib.axes.Axes, optional
+        Axis to draw on. The default is None (a new figure).
 
     Returns
     -------
-    None.
+    matplotlib.axes.Axes
+        The axis.
 
     '''
+    axis, show = plotAxis(axis)
     if title:
-        figure, axis = plt.subplots()
         axis.set_title(title)
-    plt.boxplot(X)
-    plt.show()
+    axis.boxplot(X)
+    if show:
+        pyplot().show()
+    return axis
 
-def plotBar(X: list, Y: list, title: str= None):
+def plotBar(X: list, Y: list, title: str= None, axis= None):
     '''
     Plots bar plot using X and Y.
 
@@ -240,38 +685,129 @@ def plotBar(X: list, Y: list, title: str= None):
         The heights.
     title : str, optional
         Title for the plot. The default is None.
+    axis : matplotlib.axes.Axes, optional
+        Axis to draw on. The default is None (a new figure).
 
     Returns
     -------
-    None.
+    matplotlib.axes.Axes
+        The axis.
 
     '''
+    axis, show = plotAxis(axis)
     if title:
-        figure, axis = plt.subplots()
         axis.set_title(title)
-    plt.bar(X, Y)
-    plt.show()
+    axis.bar(X, Y)
+    if show:
+        pyplot().show()
+    return axis
 
-def plotCorr(data: DataCsv):
+def plotCorr(data: Dataset, axis= None):
     '''
     Plots correlation matrix for the dataset
 
     Parameters
     ----------
-    data : DataCsv
+    data : Dataset
+        
+    axis : matplotlib.axes.Axes, optional
+        Axis to draw on. The default is None (a new figure).
+
+    Returns
+    -------
+    matplotlib.axes.Axes
+        The axis.
+
+    '''
+    axis, show = plotAxis(axis)
+    names = data.numeric()
+    corr_matrix = corrMatrix(data, names)
+    image = axis.imshow(corr_matrix, cmap='magma', vmin=-1, vmax=1)
+    axis.figure.colorbar(image, ax=axis)
+    axis.set_xticks(range(len(names)), names, rotation=90)
+    axis.set_yticks(range(len(names)), names)
+    for (i, j), value in np.ndenumerate(corr_matrix):
+        axis.text(j, i, f"{value:.2g}", ha='center', va='center', color='white' if value < 0.5 else 'black')
+    if show:
+        pyplot().show()
+    return axis
+    
+def covMatrix(data: Dataset, names: list= None, block_size: int= None) -> np.ndarray:
+    '''
+    Computes the covariance matrix of the columns of a dataset.
+    
+    The columns are centred and all pairs are obtained from matrix products,
+    with block_size only that many columns are centred at a time.
+
+    Parameters
+    ----------
+    data : Dataset
         
+    names : list, optional
+        Columns to use. The default is every numeric column.
+    block_size : int, optional
+        Number of columns per block, bounds the memory to about
+        2 * block_size columns. The default is all columns at once.
 
     Returns
     -------
-    None.
+    np.ndarray
+        k x k covariance matrix.
 
     '''
-    corr_matrix = [[corr(data[i], data[j]) for i in data.header] for j in data.header]
-    sns.heatmap(corr_matrix, annot=True, xticklabels=data.header, yticklabels=data.header)
+    return np.round(_scatterMatrix(data, names, block_size) / (len(data) - 1), 4)
+
+def corrMatrix(data: Dataset, names: list= None, block_size: int= None) -> np.ndarray:
+    '''
+    Computes the correlation matrix of the columns of a dataset.
+
+    Parameters
+    ----------
+    data : Dataset
+        
+    names : list, optional
+        Columns to use. The default is every numeric column.
+    block_size : int, optional
+        Number of columns per block (see covMatrix). The default is all columns at once.
+
+    Returns
+    -------
+    np.ndarray
+        k x k correlation matrix.
+
+    '''
+    S = _scatterMatrix(data, names, block_size)
+    d = np.sqrt(np.diag(S))
+    R = S / np.outer(d, d)
+    np.fill_diagonal(R, 1)
+    return np.round(R, 4)
+
+def _scatterMatrix(data: Dataset, names: list, block_size: int) -> np.ndarray:
+    '''
+    Matrix of sums of products of the centred columns.
+    '''
+    if names is None:
+        names = data.numeric()
+    k = len(names)
+    block_size = block_size or max(k, 1)
+    blocks = [names[i:i + block_size] for i in range(0, k, block_size)]
+    centred = lambda block: np.column_stack([data[i] - np.mean(data[i]) for i in block])
+    
+    S = np.empty((k, k))
+    for bi, block_i in enumerate(blocks):
+        Xi = centred(block_i)
+        i0 = bi * block_size
+        for bj in range(bi, len(blocks)):
+            Xj = Xi if bj == bi else centred(blocks[bj])
+            j0 = bj * block_size
+            S[i0:i0 + Xi.shape[1], j0:j0 + Xj.shape[1]] = Xi.T @ Xj
+            S[j0:j0 + Xj.shape[1], i0:i0 + Xi.shape[1]] = S[i0:i0 + Xi.shape[1], j0:j0 + Xj.shape[1]].T
+    return S
     
 def confidenceIntMeanZ(sample_mean: float, n: int, std: float, CL: float= 0.95) -> tuple:
     '''
-    Calculates 0.9, 0.95 or 0.99 confidence interval for the sample mean.
+    Calculates the z confidence interval of the sample mean, at any
+    confidence level. Vectorized, every argument may be an array.
 
     Parameters
     ----------
@@ -293,19 +829,42 @@ def confidenceIntMeanZ(sample_mean: float, n: int, std: float, CL: float= 0.95)
     margin = z_score(CL) * (std / (np.sqrt(n)))
     return margin, [sample_mean - margin, sample_mean + margin]
 
+def confidenceIntMeanT(sample_mean: float, n: int, std: float, CL: float= 0.95) -> tuple:
+    '''
+    Calculates the Student's t confidence interval of the sample mean (with
+    the sample standard deviation), at any confidence level. Vectorized,
+    every argument may be an array.
+
+    Parameters
+    ----------
+    sample_mean : float
+        
+    n : int
+        Number of observations, the margin is nan with less than 2.
+    std : float
+        Sample standard deviation.
+    CL : float, optional
+        Confidence level. The default is 0.95.
+
+    Returns
+    -------
+    tuple
+        Margin of error and interval limits.
+
+    '''
+    df = np.asarray(n) - 1
+    score = np.where(df > 0, t_score(CL, np.maximum(df, 1)), np.nan)
+    margin = score * (std / (np.sqrt(n)))
+    return margin, [sample_mean - margin, sample_mean + margin]
+
 def z_score(CL: float) -> float:
     '''
-    
+    Two sided critical value of the standard normal distribution.
 
     Parameters
     ----------
     CL : float
-        Confidence level.
-
-    Raises
-    ------
-    Exception
-        When CL has an unexpected value.
+        Confidence level, in (0, 1), scalar or array.
 
     Returns
     -------
@@ -313,14 +872,40 @@ def z_score(CL: float) -> float:
         Z score for the given CL.
 
     '''
-    cls_ = {0.90: 1.645, 0.95: 1.96, 0.99: 2.58}
-    if not CL in cls_:
-        raise Exception("Use one of the following for C.L.: 0.9, 0.95, 0.99")
-    return cls_[CL]
+    CL = np.asarray(CL, dtype=float)
+    assert ((0 < CL) & (CL < 1)).all(), "The confidence level must be between 0 and 1"
+    return _NORMAL.ppf((1 + CL) / 2)
+
+def t_score(CL: float, df: float) -> float:
+    '''
+    Two sided critical value of Student's t distribution.
+
+    Parameters
+    ----------
+    CL : float
+        Confidence level, in (0, 1), scalar or array.
+    df : float
+        Degrees of freedom, scalar or array.
+
+    Returns
+    -------
+    float
+        T score for the given CL and degrees of freedom.
+
+    '''
+    CL = np.asarray(CL, dtype=float)
+    assert ((0 < CL) & (CL < 1)).all(), "The confidence level must be between 0 and 1"
+    if CL.ndim == 0:
+        # Groups share few sample sizes, invert each distinct df once
+        df, inverse = np.unique(df, return_inverse=True)
+        return ContinuousDistribution.StudentT(df).ppf((1 + CL) / 2)[inverse][()]
+    return ContinuousDistribution.StudentT(df).ppf((1 + CL) / 2)
 
 def confidenceIntProportion(p: float, n: int, CL: float) -> tuple:
     '''
-    Calculates 0.9, 0.95 or 0.99 confidence interval for the sample proportion.
+    Calculates the confidence interval of the sample proportion (normal
+    approximation), at any confidence level. Vectorized, every argument may
+    be an array.
 
     Parameters
     ----------
@@ -339,3 +924,236 @@ def confidenceIntProportion(p: float, n: int, CL: float) -> tuple:
     '''
     margin = z_score(CL) * np.sqrt((p * (1- p))/ n)
     return margin, [p - margin, p + margin]
+
+def confidenceIntGroups(data: Dataset, name: str, by, CL: float= 0.95, method: str= 't') -> tuple:
+    '''
+    Confidence intervals of the mean of a column for every group of rows.
+    
+    The groups (see Dataset.groupby) are summarized at once and all the
+    intervals are computed in one vectorized call, methods:
+     - t : Student's t interval with the sample std of each group
+     - z : normal interval with the sample std of each group
+     - proportion : normal interval of the proportion, for 0/1 or bool columns
+    Groups with a single row (or a std of 0) get a margin of nan (or 0).
+
+    Parameters
+    ----------
+    data : Dataset
+        
+    name : str
+        Column of the values.
+    by : str or list
+        Column or columns of the group keys.
+    CL : float, optional
+        Confidence level. The default is 0.95.
+    method : str, optional
+        't', 'z' or 'proportion'. The default is 't'.
+
+    Raises
+    ------
+    Exception
+        When method is unknown.
+
+    Returns
+    -------
+    tuple
+        Dataset of the group keys, and arrays of the size, mean, margin of
+        error and interval limits of each group.
+
+    '''
+    groups = data.groupby(by)
+    n = groups.counts
+    means = groups.aggregate(name, 'mean')
+    stds = groups.aggregate(name, 'std')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if method == 't':
+            margin, interval = confidenceIntMeanT(means, n, stds, CL)
+        elif method == 'z':
+            margin, interval = confidenceIntMeanZ(means, n, stds, CL)
+        elif method == 'proportion':
+            margin, interval = confidenceIntProportion(means, n, CL)
+        else:
+            raise Exception("Use one of the following methods: t, z, proportion")
+    return groups.keys, n, means, margin, interval
+
+def bootstrap(statistic, *samples, n_resamples: int= 10**4, vectorized: bool= False,
+              max_bytes: int= 2**28, workers: int= 1, seed: int= None) -> np.ndarray:
+    '''
+    Bootstrap distribution of a statistic.
+    
+    The rows of the samples (paired, so corr(X, Y) resamples (x, y) pairs) are
+    drawn with replacement in blocks of resamples: each block is one matrix of
+    indices, sized so that the indices and the resampled values stay within
+    max_bytes, and there are at least 16 blocks to share among the workers.
+    The block sizes only depend on n_resamples, max_bytes and the size of the
+    samples, and the i-th block always uses the i-th stream spawned from seed,
+    so the result only depends on the seed, not on the number of workers.
+
+    Parameters
+    ----------
+    statistic : function
+        statistic(*samples) returns a number. mean, median, variance, std, cov
+        and corr of this module are evaluated a whole block at a time.
+    *samples : list
+        One or more samples of the same size.
+    n_resamples : int, optional
+        Number of resamples. The default is 10**4.
+    vectorized : bool, optional
+        If True statistic takes (resamples, n) arrays and reduces the last
+        axis, otherwise it is called on each resample. The default is False.
+    max_bytes : int, optional
+        Memory used by a block. The default is 256 MiB.
+    workers : int, optional
+        Number of processes. The default is 1 (no pool), with more statistic
+        must be picklable (a module level function).
+    seed : int, optional
+        Seed of the streams. The default is None (fresh entropy).
+
+    Returns
+    -------
+    np.ndarray
+        n_resamples values of the statistic.
+
+    '''
+    resampler = _Resampler(statistic, samples, vectorized)
+    n = resampler.n
+    row_bytes = n * (8 + sum(s.itemsize for s in resampler.samples))
+    block = max(1, min(-(-n_resamples // 16), max_bytes // row_bytes))
+    sizes = [min(block, n_resamples - start) for start in range(0, n_resamples, block)]
+    tasks = list(zip(np.random.SeedSequence(seed).spawn(len(sizes)), sizes))
+    if workers > 1:
+        with ProcessPoolExecutor(workers, initializer=_initResampler, initargs=(resampler,)) as executor:
+            return np.concatenate(list(executor.map(_runResampler, tasks)))
+    return np.concatenate(list(map(resampler, tasks)))
+
+def confidenceIntBootstrap(statistic, *samples, CL: float= 0.95, method: str= 'bca',
+                           jackknife: int= 100, **kwargs) -> tuple:
+    '''
+    Bootstrap confidence interval of a statistic, for any confidence level.
+    
+     - percentile : quantiles CL/2 away from the median of the bootstrap distribution
+     - bca : bias corrected and accelerated percentiles (Efron), the
+       acceleration is estimated with a delete-a-group jackknife of at most
+       jackknife groups (rows i, i + groups, i + 2 groups, ...), which is the
+       usual leave-one-out jackknife for samples of up to jackknife rows
+
+    Parameters
+    ----------
+    statistic : function
+        See bootstrap.
+    *samples : list
+        One or more samples of the same size.
+    CL : float, optional
+        Confidence level. The default is 0.95.
+    method : str, optional
+        'percentile' or 'bca'. The default is 'bca'.
+    jackknife : int, optional
+        Maximum number of jackknife groups. The default is 100.
+    **kwargs
+        Options of bootstrap.
+
+    Raises
+    ------
+    Exception
+        When method is unknown.
+
+    Returns
+    -------
+    tuple
+        Statistic of the samples and interval limits.
+
+    '''
+    assert 0 < CL < 1, "The confidence level must be between 0 and 1"
+    replicates = bootstrap(statistic, *samples, **kwargs)
+    resampler = _Resampler(statistic, samples, kwargs.get('vectorized', False))
+    estimate = resampler.estimate(*resampler.samples)
+    alpha = (1 - CL) / 2
+    if method == 'percentile':
+        qs = np.array([alpha, 1 - alpha])
+    elif method == 'bca':
+        below = np.mean(replicates < estimate) + np.mean(replicates == estimate) / 2
+        z0 = _NORMAL.ppf(np.clip(below, 1 / (replicates.size + 1), 1 - 1 / (replicates.size + 1)))
+        groups = min(resampler.n, jackknife)
+        theta = np.array([resampler.estimate(*(np.delete(s, np.s_[g::groups]) for s in resampler.samples))
+                          for g in range(groups)])
+        d = theta.mean() - theta
+        a = np.sum(d**3) / (6 * np.sum(d**2)**1.5) if np.any(d) else 0.0
+        z = z0 + _NORMAL.ppf(np.array([alpha, 1 - alpha]))
+        qs = _NORMAL.cdf(z0 + z / (1 - a * z))
+    else:
+        raise Exception("Use one of the following methods: percentile, bca")
+    return estimate, quantile(replicates, qs).tolist()
+
+class _Resampler:
+    '''
+    Draws blocks of resamples and evaluates the statistic on them.
+    '''
+    def __init__(self, statistic, samples: tuple, vectorized: bool):
+        assert len(samples) > 0, "There must be at least one sample"
+        self.samples = tuple(np.asarray(s).ravel() for s in samples)
+        self.n = self.samples[0].size
+        assert self.n > 0, "The samples must not be empty"
+        assert all(s.size == self.n for s in self.samples), "The samples must have the same size"
+        if statistic in _BATCH_STATISTICS:
+            self.statistic = _BATCH_STATISTICS[statistic]
+        elif vectorized:
+            self.statistic = statistic
+        else:
+            self.statistic = _RowStatistic(statistic)
+    
+    def estimate(self, *samples) -> float:
+        '''
+        Statistic of a single (not resampled) set of samples.
+        '''
+        return float(np.asarray(self.statistic(*(s[None, :] for s in samples))).ravel()[0])
+    
+    def __call__(self, task: tuple) -> np.ndarray:
+        stream, size = task
+        idxs = np.random.default_rng(stream).integers(self.n, size=(size, self.n))
+        return np.asarray(self.statistic(*(s[idxs] for s in self.samples)), dtype=float).ravel()
+
+class _RowStatistic:
+    '''
+    Applies a statistic of 1d samples to each row of a block.
+    '''
+    def __init__(self, statistic):
+        self.statistic = statistic
+    
+    def __call__(self, *samples) -> np.ndarray:
+        return np.array([self.statistic(*rows) for rows in zip(*samples)], dtype=float)
+
+# Resampler of the worker processes of bootstrap
+_RESAMPLER = None
+
+def _initResampler(resampler: _Resampler):
+    global _RESAMPLER
+    _RESAMPLER = resampler
+
+def _runResampler(task: tuple) -> np.ndarray:
+    return _RESAMPLER(task)
+
+def _batchMean(X: np.ndarray) -> np.ndarray:
+    return X.mean(axis=-1)
+
+def _batchMedian(X: np.ndarray) -> np.ndarray:
+    return np.median(X, axis=-1)
+
+def _batchVariance(X: np.ndarray) -> np.ndarray:
+    return X.var(axis=-1, ddof=1)
+
+def _batchStd(X: np.ndarray) -> np.ndarray:
+    return X.std(axis=-1, ddof=1)
+
+def _batchCov(X: np.ndarray, Y: np.ndarray) -> np.ndarray:
+    X = X - X.mean(axis=-1, keepdims=True)
+    Y = Y - Y.mean(axis=-1, keepdims=True)
+    return np.einsum('ij,ij->i', X, Y) / (X.shape[-1] - 1)
+
+def _batchCorr(X: np.ndarray, Y: np.ndarray) -> np.ndarray:
+    X = X - X.mean(axis=-1, keepdims=True)
+    Y = Y - Y.mean(axis=-1, keepdims=True)
+    return np.einsum('ij,ij->i', X, Y) / np.sqrt(np.einsum('ij,ij->i', X, X) * np.einsum('ij,ij->i', Y, Y))
+
+# Statistics of this module evaluated a block of resamples at a time (without rounding)
+_BATCH_STATISTICS = {mean: _batchMean, median: _batchMedian, variance: _batchVariance,
+                     std: _batchStd, cov: _batchCov, corr: _batchCorr}